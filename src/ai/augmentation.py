@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from go.coordinate import SYMMETRIES, get_coordinates, inverse_symmetry
+
+# Applies the 8 board symmetries to batches of encoded positions (as made by FeatureEncoder) and their move targets,
+# one symmetry per position, entirely with fancy indexing over the permutation tables in Coordinates.symmetries.  Move
+# targets are coordinate indices; anything outside the board (a pass, whether written as -1 or as span * span) is left
+# alone.  Policy targets may carry a trailing pass column, which is left alone too.
+
+
+class Augmenter:
+    def __init__(self, span: int):
+        self.span = span
+        self.size = span * span
+        symmetries = get_coordinates(span).symmetries
+        # forward[symmetry, index] is where a point moves; gather[symmetry, index] is the point that moves to index.
+        self._forward = np.array(symmetries, dtype=np.intp)
+        self._gather = np.array([symmetries[inverse_symmetry(symmetry)] for symmetry in range(SYMMETRIES)],
+                                dtype=np.intp)
+
+    def random_symmetries(self, count: int, rng: np.random.Generator = None):
+        rng = rng if rng is not None else np.random.default_rng()
+        return rng.integers(0, SYMMETRIES, size=count)
+
+    def planes(self, planes: np.ndarray, symmetries: np.ndarray):
+        count = len(planes)
+        flat = planes.reshape(count, -1, self.size)
+        gather = self._gather[symmetries][:, np.newaxis, :]
+        return np.take_along_axis(flat, gather, axis=2).reshape(planes.shape)
+
+    def moves(self, moves: np.ndarray, symmetries: np.ndarray):
+        on_board = (moves >= 0) & (moves < self.size)
+        images = self._forward[symmetries, np.where(on_board, moves, 0)]
+        return np.where(on_board, images, moves).astype(moves.dtype, copy=False)
+
+    def policies(self, policies: np.ndarray, symmetries: np.ndarray):
+        gather = self._gather[symmetries]
+        board = np.take_along_axis(policies[:, :self.size], gather, axis=1)
+        if policies.shape[1] == self.size:
+            return board
+        return np.concatenate([board, policies[:, self.size:]], axis=1)
+
+    def augment(self, planes: np.ndarray, moves: np.ndarray = None, symmetries: np.ndarray = None, rng=None):
+        # One random (or given) symmetry per position.  Returns the transformed planes, moves and the symmetries used.
+        if symmetries is None:
+            symmetries = self.random_symmetries(len(planes), rng)
+        return (
+            self.planes(planes, symmetries),
+            None if moves is None else self.moves(moves, symmetries),
+            symmetries
+        )
+
+    def expand(self, planes: np.ndarray, moves: np.ndarray = None):
+        # Every position under all 8 symmetries, grouped by symmetry: row symmetry * count + n is position n moved by
+        # symmetry.
+        count = len(planes)
+        symmetries = np.repeat(np.arange(SYMMETRIES), count)
+        planes = np.tile(planes, (SYMMETRIES,) + (1,) * (planes.ndim - 1))
+        moves = None if moves is None else np.tile(moves, SYMMETRIES)
+        return self.augment(planes, moves, symmetries)
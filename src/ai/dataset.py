@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Iterable
+from go import rules
+from go.coordinate import PASS, get_coordinates
+from go.game import Game
+
+# Finished games are stored back to back in a shard file, each as a fixed 24-byte header followed by its handicap
+# stones and moves as little-endian 16-bit Coordinate indices (PASS_CODE for a pass):
+#
+#   span (B), handicap stone count (B), move count (H), compensation (d), margin (d), rules (B), flags (B),
+#   reserved (2x)
+#
+# The margin is Black's score minus White's, or NaN for a game that was never scored.  rules indexes the game's RuleSet
+# in RULES (shards written before the field existed read as 0, TRAINING) and bit 0 of flags is its double_hash.  A
+# sidecar index file (the shard's path plus INDEX_SUFFIX) holds each game's offset and the number of positions in the
+# shard before it, so a reader can find any game or any position without touching the rest of the shard.  A position is
+# a game's state before one of its moves, paired with that move and the game's margin.
+
+MAGIC = b'GOGAMES1'
+INDEX_MAGIC = b'GOINDEX1'
+INDEX_SUFFIX = '.index'
+PASS_CODE = 0xFFFF
+
+RULES = (rules.TRAINING, rules.AGA, rules.CHINESE, rules.JAPANESE, rules.TROMP_TAYLOR)
+DOUBLE_HASH = 1
+
+_HEADER = struct.Struct('<BBHddBB2x')
+_COUNT = struct.Struct('<Q')
+
+
+def _little_endian(typecode: str, values: Iterable[int]):
+    values = array(typecode, values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _write_index(path: str, offsets: array, starts: array, positions: int):
+    with open(path + INDEX_SUFFIX, 'wb') as index:
+        index.write(INDEX_MAGIC)
+        index.write(_COUNT.pack(len(offsets)))
+        index.write(_COUNT.pack(positions))
+        index.write(_little_endian('Q', offsets).tobytes())
+        index.write(_little_endian('Q', starts).tobytes())
+
+
+def _encode(move):
+    return PASS_CODE if move == PASS else move.index
+
+
+def _rules_code(rule_set):
+    for code, preset in enumerate(RULES):
+        if vars(preset) == vars(rule_set):
+            return code
+    raise Exception('Only games under the RuleSets in RULES can be recorded.')
+
+
+def _margin(game: Game):
+    outcome = game.outcome
+    if outcome.margin is None:
+        return float('nan')
+    return outcome.black_score - outcome.white_score
+
+
+class RecordWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.positions = 0
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._offsets = array('Q')
+        self._starts = array('Q')
+
+    def write(self, game: Game):
+        moves = []
+        state = game
+        while state.previous_state is not None:
+            if state.moves_played != state.previous_state.moves_played:
+                moves.append(_encode(state.previous_move))
+            state = state.previous_state
+        moves.reverse()
+        handicap_stones = sorted(stone.index for stone in state.handicap_stones)
+
+        self._offsets.append(self._file.tell())
+        self._starts.append(self.positions)
+        self._file.write(_HEADER.pack(
+            state.board.span,
+            len(handicap_stones),
+            len(moves),
+            state.compensation,
+            _margin(game),
+            _rules_code(state.rules),
+            DOUBLE_HASH if state.double_hash else 0
+        ))
+        self._file.write(_little_endian('H', handicap_stones + moves).tobytes())
+        self.count += 1
+        self.positions += len(moves)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        _write_index(self.path, self._offsets, self._starts, self.positions)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def build_index(path: str):
+    # Rebuilds a shard's index by walking its record headers, e.g. for a shard whose writer never closed.
+    offsets = array('Q')
+    starts = array('Q')
+    positions = 0
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise Exception(f'{path} is not a game record shard.')
+        end = os.fstat(file.fileno()).st_size
+        offset = len(MAGIC)
+        while offset + _HEADER.size <= end:
+            file.seek(offset)
+            _, handicap, moves, _, _, _, _ = _HEADER.unpack(file.read(_HEADER.size))
+            following = offset + _HEADER.size + 2 * (handicap + moves)
+            if following > end:
+                break
+            offsets.append(offset)
+            starts.append(positions)
+            positions += moves
+            offset = following
+    _write_index(path, offsets, starts, positions)
+
+
+class GameRecord:
+    def __init__(
+        self,
+        span: int,
+        compensation: float,
+        margin: float,
+        handicap_stones,
+        moves,
+        rule_set: rules.RuleSet = rules.TRAINING,
+        double_hash: bool = False
+    ):
+        self.span = span
+        self.compensation = compensation
+        self.margin = margin
+        self.handicap_stones = handicap_stones
+        self.moves = moves
+        self.rules = rule_set
+        self.double_hash = double_hash
+
+    def __len__(self):
+        return len(self.moves)
+
+    def move(self, number: int):
+        code = self.moves[number]
+        return PASS if code == PASS_CODE else get_coordinates(self.span)[code]
+
+    def start(self):
+        coordinates = get_coordinates(self.span)
+        return Game(
+            rules=self.rules,
+            span=self.span,
+            compensation=self.compensation,
+            handicap_placement=[coordinates[index] for index in self.handicap_stones] or None,
+            double_hash=self.double_hash
+        )
+
+    def replay(self, moves: int = None):
+        # Yields the Game before each move (and the Game after the last one), up to the given number of moves.
+        game = self.start()
+        yield game
+        for number in range(len(self.moves) if moves is None else moves):
+            game = game.play(self.move(number))
+            yield game
+
+    def position(self, number: int):
+        assert 0 <= number < len(self.moves)
+        game = None
+        for game in self.replay(number):
+            pass
+        return game, self.move(number), self.margin
+
+
+class GameRecords:
+    # One memory-mapped shard.  Only the index is read up front; games are decoded on access.
+    def __init__(self, path: str):
+        self.path = path
+        if not os.path.exists(path + INDEX_SUFFIX):
+            build_index(path)
+        with open(path + INDEX_SUFFIX, 'rb') as index:
+            if index.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise Exception(f'{path + INDEX_SUFFIX} is not a game record index.')
+            (count,) = _COUNT.unpack(index.read(_COUNT.size))
+            (self.positions,) = _COUNT.unpack(index.read(_COUNT.size))
+            self._offsets = _little_endian('Q', memoryview(index.read(8 * count)).cast('Q'))
+            self._starts = _little_endian('Q', memoryview(index.read(8 * count)).cast('Q'))
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise Exception(f'{path} is not a game record shard.')
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, number: int):
+        offset = self._offsets[number]
+        span, handicap, moves, compensation, margin, rules_code, flags = _HEADER.unpack_from(self._map, offset)
+        start = offset + _HEADER.size
+        codes = array('H')
+        codes.frombytes(self._map[start:start + 2 * (handicap + moves)])
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        if rules_code >= len(RULES):
+            raise Exception(f'Game {number} of {self.path} was played under unknown rules ({rules_code}).')
+        return GameRecord(
+            span,
+            compensation,
+            margin,
+            codes[:handicap],
+            codes[handicap:],
+            RULES[rules_code],
+            bool(flags & DOUBLE_HASH)
+        )
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+
+    def locate(self, position: int):
+        assert 0 <= position < self.positions
+        number = bisect_right(self._starts, position) - 1
+        return number, position - self._starts[number]
+
+    def position(self, position: int):
+        number, move = self.locate(position)
+        return self[number].position(move)
+
+
+class Dataset:
+    # Any number of shards addressed as one sequence of positions.
+    def __init__(self, paths: Iterable[str]):
+        self.shards = [GameRecords(path) for path in paths]
+        self._starts = []
+        self.positions = 0
+        for shard in self.shards:
+            self._starts.append(self.positions)
+            self.positions += shard.positions
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return self.positions
+
+    def games(self):
+        for shard in self.shards:
+            yield from shard
+
+    def position(self, position: int):
+        assert 0 <= position < self.positions
+        shard = bisect_right(self._starts, position) - 1
+        return self.shards[shard].position(position - self._starts[shard])
+
+    def sample(self, count: int, rng: random.Random = None):
+        rng = rng if rng is not None else random.Random()
+        return [self.position(rng.randrange(self.positions)) for _ in range(count)]
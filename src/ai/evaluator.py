@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+import asyncio
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .features import PLANES, FeatureEncoder
+from go.game import Game
+
+# Neural-network evaluation is cheap per position only in batches, so BatchedEvaluator lets any number of concurrent
+# searches or games await evaluate(game) while it gathers their requests into batches.  A batch is flushed once it holds
+# max_batch requests or max_delay seconds after its first request arrived, encoded into a reused buffer, and pushed
+# through the model in one forward pass on a worker thread (NumPy releases the GIL), so the next batch can gather while
+# the current one runs.  Each request gets back a policy over the board points plus a final pass entry, restricted to
+# the points that are empty and playable, and a value in [-1, 1] for the player to move.
+
+
+class NumpyModel:
+    # A small policy/value network: one shared ReLU layer over the flattened feature planes, then a policy head and a
+    # tanh value head.  It exists to give the evaluator a real vectorised forward pass on CPU; load() replaces its
+    # weights with trained ones.
+    def __init__(self, span: int, hidden: int = 128, seed: int = 0, dtype=np.float32):
+        rng = np.random.default_rng(seed)
+        inputs = PLANES * span * span
+        self.span = span
+        self.weights = {
+            'hidden': (rng.standard_normal((inputs, hidden)) / np.sqrt(inputs)).astype(dtype),
+            'hidden_bias': np.zeros(hidden, dtype=dtype),
+            'policy': (rng.standard_normal((hidden, span * span + 1)) / np.sqrt(hidden)).astype(dtype),
+            'policy_bias': np.zeros(span * span + 1, dtype=dtype),
+            'value': (rng.standard_normal((hidden, 1)) / np.sqrt(hidden)).astype(dtype),
+            'value_bias': np.zeros(1, dtype=dtype),
+        }
+
+    def forward(self, planes: np.ndarray):
+        weights = self.weights
+        flat = planes.reshape(len(planes), -1)
+        hidden = np.maximum(flat @ weights['hidden'] + weights['hidden_bias'], 0)
+        logits = hidden @ weights['policy'] + weights['policy_bias']
+        values = np.tanh(hidden @ weights['value'] + weights['value_bias'])[:, 0]
+        return logits, values
+
+    def save(self, path: str):
+        np.savez(path, **self.weights)
+
+    def load(self, path: str):
+        with np.load(path) as weights:
+            for name in self.weights:
+                assert weights[name].shape == self.weights[name].shape
+                self.weights[name] = weights[name].astype(self.weights[name].dtype)
+
+
+def _policies(logits: np.ndarray, playable: np.ndarray):
+    mask = np.concatenate([playable, np.ones((len(playable), 1), dtype=bool)], axis=1)
+    logits = np.where(mask, logits, -np.inf)
+    logits -= logits.max(axis=1, keepdims=True)
+    weights = np.exp(logits)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+class BatchedEvaluator:
+    def __init__(self, model: NumpyModel, max_batch: int = 32, max_delay: float = 0.002):
+        assert max_batch > 0 and max_delay >= 0
+        self.model = model
+        self.encoder = FeatureEncoder(model.span)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.evaluations = 0
+        self._buffer = self.encoder.allocate(max_batch)
+        self._queue = None
+        self._worker = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    @property
+    def mean_batch(self):
+        return self.evaluations / self.batches if self.batches else 0.
+
+    async def evaluate(self, game: Game):
+        if self._worker is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((game, future))
+        return await future
+
+    def start(self):
+        assert self._worker is None
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def _gather(self, requests: list):
+        requests.append(await self._queue.get())
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while len(requests) < self.max_batch:
+            if not self._queue.empty():
+                requests.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                requests.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        running = None
+        requests = []
+        flushing = []
+        try:
+            while True:
+                requests = []
+                await self._gather(requests)
+                if running is not None:
+                    await running
+                running = loop.create_task(self._flush(requests))
+                flushing, requests = requests, []
+        finally:
+            if running is not None:
+                running.cancel()
+            for _, future in flushing + requests:
+                if not future.done():
+                    future.cancel()
+
+    async def _flush(self, requests):
+        games = [game for game, _ in requests]
+        futures = [future for _, future in requests]
+        try:
+            planes = self.encoder.encode_batch(games, self._buffer[:len(games)])
+            logits, values = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.model.forward, planes
+            )
+            policies = _policies(logits, planes[:, 2].reshape(len(games), -1) > 0)
+        except Exception as error:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.batches += 1
+        self.evaluations += len(games)
+        for future, policy, value in zip(futures, policies, values):
+            if not future.done():
+                future.set_result((policy, float(value)))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from typing import Sequence
+from go.color import Color
+from go.coordinate import get_coordinates
+from go.game import Game
+
+# Encodes Games as stacks of feature planes for a network, one (PLANES, span, span) array per Game.  Everything after
+# gathering each Game's cells is done with whole-batch array operations: chains are labelled by propagating the
+# smallest cell index through same-colored neighbors (with pointer jumping), and a chain's liberties are the distinct
+# (chain, empty neighbor) pairs.
+#
+#   0      stones of the player to move
+#   1      stones of the opponent
+#   2      empty, playable points
+#   3      UNPLAYABLE points
+#   4-7    stones whose chain has 1, 2, 3, or 4+ liberties
+#   8      the ko point
+#   9      all ones when Black is to move
+
+PLANES = 10
+
+_EMPTY = Color.EMPTY.index
+_BLACK = Color.BLACK.index
+_WHITE = Color.WHITE.index
+_UNPLAYABLE = Color.UNPLAYABLE.index
+_OFF_BOARD = 0xFF
+
+
+def _player(game: Game):
+    return game.current_player.index if not game.over else _EMPTY
+
+
+class FeatureEncoder:
+    def __init__(self, span: int, dtype=np.float32):
+        self.span = span
+        self.size = span * span
+        self.dtype = dtype
+        neighbors = np.full((self.size, 4), self.size, dtype=np.intp)
+        for index, adjacent in enumerate(get_coordinates(span).neighbor_indices):
+            neighbors[index, :len(adjacent)] = adjacent
+        self._neighbors = neighbors
+
+    def allocate(self, count: int):
+        return np.zeros((count, PLANES, self.span, self.span), dtype=self.dtype)
+
+    def encode(self, game: Game, out: np.ndarray = None):
+        batch = None if out is None else out[np.newaxis]
+        return self.encode_batch([game], batch)[0]
+
+    def encode_batch(self, games: Sequence[Game], out: np.ndarray = None):
+        count = len(games)
+        size = self.size
+        if out is None:
+            out = self.allocate(count)
+        assert out.shape == (count, PLANES, self.span, self.span) and out.flags.c_contiguous
+        planes = out.reshape(count, PLANES, size)
+
+        cells = np.frombuffer(b''.join(bytes(game.board.cells) for game in games), dtype=np.uint8)
+        cells = cells.reshape(count, size)
+        players = np.fromiter((_player(game) for game in games), dtype=np.uint8, count=count)
+        ko_points = np.fromiter(
+            (size if game.ko_point is None else game.ko_point.index for game in games),
+            dtype=np.intp,
+            count=count
+        )
+
+        stones = (cells == _BLACK) | (cells == _WHITE)
+        own = cells == players[:, np.newaxis]
+        liberties = self._liberties(cells, stones)
+
+        planes[:, 0] = own
+        planes[:, 1] = stones & ~own
+        planes[:, 2] = cells == _EMPTY
+        planes[:, 3] = cells == _UNPLAYABLE
+        planes[:, 4] = liberties == 1
+        planes[:, 5] = liberties == 2
+        planes[:, 6] = liberties == 3
+        planes[:, 7] = liberties >= 4
+        planes[:, 8] = 0
+        has_ko = ko_points < size
+        planes[np.flatnonzero(has_ko), 8, ko_points[has_ko]] = 1
+        planes[:, 9] = (players == _BLACK)[:, np.newaxis]
+        return out
+
+    def _liberties(self, cells: np.ndarray, stones: np.ndarray):
+        count, size = cells.shape
+        neighbors = self._neighbors
+        padded = np.concatenate([cells, np.full((count, 1), _OFF_BOARD, dtype=np.uint8)], axis=1)
+        neighbor_cells = padded[:, neighbors]
+        same = stones[:, :, np.newaxis] & (neighbor_cells == cells[:, :, np.newaxis])
+
+        sentinel = np.full((count, 1), size, dtype=np.intp)
+        labels = np.where(stones, np.arange(size), size)
+        while True:
+            padded_labels = np.concatenate([labels, sentinel], axis=1)
+            adjacent = np.where(same, padded_labels[:, neighbors], size).min(axis=2)
+            updated = np.minimum(labels, adjacent)
+            updated = np.take_along_axis(np.concatenate([updated, sentinel], axis=1), updated, axis=1)
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+
+        free = stones[:, :, np.newaxis] & ((neighbor_cells == _EMPTY) | (neighbor_cells == _UNPLAYABLE))
+        game, cell, direction = np.nonzero(free)
+        chains = game * size + labels[game, cell]
+        pairs = np.unique(chains * size + neighbors[cell, direction])
+        per_chain = np.bincount(pairs // size, minlength=count * size)
+        chain_of_cell = np.arange(count)[:, np.newaxis] * size + np.where(stones, labels, 0)
+        return np.where(stones, per_chain[chain_of_cell], 0)
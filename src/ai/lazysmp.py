@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, wait
+from .agent import Agent
+from .mtdf import MTDfAgent
+from .shared_transposition import SharedTranspositionTable
+from go import zobrist
+from go.coordinate import PASS, get_coordinates
+from go.game import Game
+from go.rules import RuleSet
+
+# Lazy SMP: every worker process runs its own MTDfAgent on the same root, and they cooperate only through a shared
+# transposition table.  Odd-numbered workers aim one ply deeper so that the workers spread over different iterations
+# instead of repeating each other.  Once worker 0 finishes, the others are told to stop through the table's stop flag,
+# and the move from the deepest completed iteration is played.  Games reach the workers as their move lists and are
+# replayed there, since a Game drags its whole history along when pickled.
+
+_PASS_CODE = -1
+
+_worker = {}
+
+
+def _initialize_worker(name: str, size: int, fingerprint: int):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if zobrist.FINGERPRINT != fingerprint:
+        raise Exception('This worker built a different Zobrist table than the process that started it.')
+    table = SharedTranspositionTable(size, name=name)
+    _worker['table'] = table
+    _worker['agent'] = MTDfAgent(table=table, stop=lambda: table.stopped)
+
+
+def _moves(game: Game):
+    moves = []
+    state = game
+    while state.previous_state is not None:
+        moves.append(_PASS_CODE if state.previous_move == PASS else state.previous_move.index)
+        state = state.previous_state
+    moves.reverse()
+    handicap_stones = sorted(stone.index for stone in state.handicap_stones)
+    return state.rules, state.board.span, state.compensation, handicap_stones, moves
+
+
+def _replay(rules: RuleSet, span: int, compensation: float, handicap_stones, moves):
+    coordinates = get_coordinates(span)
+    game = Game(
+        rules=rules,
+        span=span,
+        compensation=compensation,
+        handicap_placement=[coordinates[index] for index in handicap_stones] or None
+    )
+    for move in moves:
+        game = game.play(PASS if move == _PASS_CODE else coordinates[move])
+    return game
+
+
+def _search(setup, max_depth: int, time_limit: float):
+    agent = _worker['agent']
+    agent.max_depth = max_depth
+    agent.time_limit = time_limit
+    move = agent.select_move(_replay(*setup))
+    return _PASS_CODE if move == PASS else move.index, agent.depth_reached, agent.nodes
+
+
+class LazySMPAgent(Agent):
+    def __init__(
+        self,
+        workers: int = None,
+        max_depth: int = 2,
+        table_size: int = 1 << 20,
+        time_limit: float = None
+    ):
+        super().__init__()
+        self.workers = workers if workers else os.cpu_count() or 1
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.table = SharedTranspositionTable(table_size)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_initialize_worker,
+            initargs=(self.table.name, table_size, zobrist.FINGERPRINT)
+        )
+        self.nodes = 0
+        self.depth_reached = 0
+
+    def select_move(self, game: Game):
+        self.table.new_search()
+        setup = _moves(game)
+        futures = [
+            self.executor.submit(_search, setup, self.max_depth + worker % 2, self.time_limit)
+            for worker in range(self.workers)
+        ]
+        try:
+            wait(futures[:1])
+        finally:
+            self.table.stop()
+            wait(futures)
+        results = [future.result() for future in futures]
+        move, self.depth_reached, _ = max(results, key=lambda result: result[1])
+        self.nodes = sum(result[2] for result in results)
+        return PASS if move == _PASS_CODE else game.board.coordinates[move]
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
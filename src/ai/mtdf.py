@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+import time
+from typing import Callable
+from .agent import Agent
+from .ordering import MoveOrdering
+from .transposition import TranspositionTable
+from go.color import Color
+from go.coordinate import PASS
+from go.game import Game
+from go.position import Position, PASS_MOVE
+
+# MTD(f) finds the minimax value with a sequence of zero-window alpha-beta searches that converge on it from a first
+# guess.  Each pass re-searches the same tree, so the transposition table (keyed by Position.key, i.e. the board hash
+# combined with the side-to-move and pass-state keys) carries the bounds from one pass to the next.  Values are
+# half-points from the perspective of the player to move, so that every zero-window step is an integer.
+
+_INFINITY = float('inf')
+_BLACK = Color.BLACK.index
+_WHITE = Color.WHITE.index
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _area(cells, neighbors):
+    total = 0
+    visited = bytearray(len(cells))
+    for start, color in enumerate(cells):
+        if color == _BLACK:
+            total += 1
+        elif color == _WHITE:
+            total -= 1
+        elif not visited[start]:
+            visited[start] = 1
+            region = [start]
+            reaches_black = False
+            reaches_white = False
+            for current in region:
+                for neighbor in neighbors[current]:
+                    neighbor_color = cells[neighbor]
+                    if neighbor_color == _BLACK:
+                        reaches_black = True
+                    elif neighbor_color == _WHITE:
+                        reaches_white = True
+                    elif not visited[neighbor]:
+                        visited[neighbor] = 1
+                        region.append(neighbor)
+            if reaches_black and not reaches_white:
+                total += len(region)
+            elif reaches_white and not reaches_black:
+                total -= len(region)
+    return total
+
+
+class MTDfAgent(Agent):
+    def __init__(
+        self,
+        max_depth: int = 2,
+        table_size: int = 1 << 18,
+        time_limit: float = None,
+        table=None,
+        stop: Callable[[], bool] = None
+    ):
+        # table may be any object with TranspositionTable's interface (e.g. a SharedTranspositionTable); stop, when
+        # given, is polled like the deadline and ends the search early once it returns True.
+        super().__init__()
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.stop = stop
+        self.table = table if table is not None else TranspositionTable(table_size)
+        self.ordering = MoveOrdering()
+        self.nodes = 0
+        self.depth_reached = 0
+        self._compensation = 0
+        self._deadline = None
+        self._neighbors = None
+        self._root = None
+        self._best = None
+
+    def select_move(self, game: Game):
+        root = Position.from_game(game)
+        self.table.new_search()
+        self.ordering.new_search()
+        self.nodes = 0
+        self.depth_reached = 0
+        self._compensation = int(round(2 * game.compensation))
+        self._neighbors = game.board.coordinates.neighbor_indices
+        self._root = root
+
+        # The deadline and stop apply from the first iteration on; if that one is cut short, the move ordering's first
+        # choice stands in for its result.
+        started = time.monotonic()
+        self._deadline = None
+        if self.time_limit is not None:
+            self._deadline = started + self.time_limit
+        elif self.stop is not None:
+            self._deadline = _INFINITY
+        guess = self._evaluate(root)
+        move = None
+        try:
+            for depth in range(1, self.max_depth + 1):
+                guess, move = self._mtdf(root, guess, depth)
+                self.depth_reached = depth
+        except _Timeout:
+            pass
+        finally:
+            self._root = None
+        if move is None:
+            move = self.ordering.order_position(root, 1)[0]
+        return PASS if move == PASS_MOVE else game.board.coordinates[move]
+
+    def _mtdf(self, root: Position, guess: int, depth: int):
+        lower = -_INFINITY
+        upper = _INFINITY
+        value = guess
+        move = None
+        while lower < upper:
+            beta = value + 1 if value == lower else value
+            value = self._alpha_beta(root, beta - 1, beta, depth)
+            if value < beta:
+                upper = value
+            else:
+                lower = value
+                move = self._best
+        return value, self._best if move is None else move
+
+    def _alpha_beta(self, node: Position, alpha: float, beta: float, depth: int):
+        self.nodes += 1
+        if (
+            self._deadline is not None and
+            not self.nodes & 0xFF and
+            (time.monotonic() > self._deadline or self.stop is not None and self.stop())
+        ):
+            raise _Timeout()
+
+        key = node.key
+        entry = self.table.probe(key)
+        lower = -_INFINITY
+        upper = _INFINITY
+        hint = None
+        if entry is not None:
+            stored_depth, stored_lower, stored_upper, hint = entry
+            if stored_depth >= depth and node is not self._root:
+                if stored_lower >= beta:
+                    return stored_lower
+                if stored_upper <= alpha:
+                    return stored_upper
+                alpha = max(alpha, stored_lower)
+                beta = min(beta, stored_upper)
+            if stored_depth == depth:
+                lower = stored_lower
+                upper = stored_upper
+
+        best = None
+        if depth == 0 or node.over:
+            value = self._evaluate(node)
+        else:
+            value = -_INFINITY
+            bound = alpha
+            for rank, move in enumerate(self.ordering.order_position(node, depth, hint)):
+                score = -self._alpha_beta(node.play(move), -beta, -bound, depth - 1)
+                if score > value:
+                    value = score
+                    best = move
+                if value >= beta:
+                    self.ordering.cutoff(move, depth, rank)
+                    break
+                if value > bound:
+                    bound = value
+
+        if value <= alpha:
+            upper = value
+        elif value >= beta:
+            lower = value
+        else:
+            lower = upper = value
+        self.table.store(key, depth, lower, upper, best)
+        if node is self._root:
+            self._best = best
+        return value
+
+    def _evaluate(self, node: Position):
+        score = 2 * _area(node.cells, self._neighbors) - self._compensation
+        return score if node.player == _BLACK else -score
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+from go.constants import MAX_SPAN
+from go.coordinate import PASS
+from go.game import Game
+from go.position import Position, PASS_MOVE
+
+# Orders candidate moves so that alpha-beta sees its likely refutations first: the transposition table's best move,
+# then captures and atari escapes (the last liberties of groups in atari), then the killer moves that caused cutoffs at
+# the same depth, then everything else by its history-heuristic score.  Passes go last unless they are the table's
+# move or a killer.  Moves are handled as coordinate indices; order_game() translates a Game's Coordinates.
+
+
+class MoveOrdering:
+    def __init__(self, killers: int = 2):
+        self.killers_per_depth = killers
+        self.killers = {}
+        self.history = [0] * (MAX_SPAN * MAX_SPAN)
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        self.killers = {}
+        self.history = [score >> 1 for score in self.history]
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    @property
+    def cut_rate(self):
+        return self.cutoffs / self.nodes if self.nodes else 0.
+
+    @property
+    def first_move_cut_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.
+
+    def order_position(self, node: Position, depth: int = 0, hint: int = None):
+        captures, escapes = node.atari_liberties()
+        return self._order(list(node.legal_moves()), captures, escapes, depth, hint)
+
+    def order_game(self, game: Game, depth: int = 0, hint=None):
+        captures = set()
+        escapes = set()
+        for group in game.groups:
+            if len(group.liberties) == 1:
+                (liberty,) = group.liberties
+                if group.color is game.current_player:
+                    escapes.add(liberty.index)
+                else:
+                    captures.add(liberty.index)
+        moves = [PASS_MOVE if move == PASS else move.index for move in game.legal_moves]
+        legal = set(moves)
+        hint = None if hint is None else PASS_MOVE if hint == PASS else hint.index
+        ordered = self._order(moves, captures & legal, escapes & legal, depth, hint)
+        coordinates = game.board.coordinates
+        return [PASS if move == PASS_MOVE else coordinates[move] for move in ordered]
+
+    def cutoff(self, move: int, depth: int, rank: int):
+        self.cutoffs += 1
+        if rank == 0:
+            self.first_move_cutoffs += 1
+        killers = self.killers.setdefault(depth, [])
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.killers_per_depth:]
+        if move != PASS_MOVE:
+            self.history[move] += depth * depth
+
+    def _order(self, moves, captures, escapes, depth: int, hint: int):
+        self.nodes += 1
+        legal = set(moves)
+        ordered = []
+        placed = set()
+        if hint is not None and hint in legal:
+            ordered.append(hint)
+            placed.add(hint)
+        for move in sorted(captures - placed, key=self._score, reverse=True):
+            ordered.append(move)
+            placed.add(move)
+        for move in sorted(escapes - placed, key=self._score, reverse=True):
+            ordered.append(move)
+            placed.add(move)
+        for move in self.killers.get(depth, ()):
+            if move not in placed and move in legal:
+                ordered.append(move)
+                placed.add(move)
+        rest = [move for move in moves if move not in placed and move != PASS_MOVE]
+        rest.sort(key=self._score, reverse=True)
+        ordered.extend(rest)
+        if PASS_MOVE not in placed and PASS_MOVE in legal:
+            ordered.append(PASS_MOVE)
+        return ordered
+
+    def _score(self, move: int):
+        return self.history[move]
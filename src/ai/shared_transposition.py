@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+from multiprocessing import shared_memory
+from go.position import PASS_MOVE
+
+# A TranspositionTable whose entries live in a multiprocessing.shared_memory block, so that search processes attached
+# to the same block share their results.  The block starts with a header of eight 64-bit words (the generation and a
+# stop flag helper searches can poll) followed by buckets of four entries, each entry two words:
+#
+#   data      depth (8 bits), generation (8), lower (16), upper (16), move (10)
+#   check     key ^ data
+#
+# There are no locks.  A writer stores check and then data; a reader recomputes key ^ data and treats a mismatch as a
+# miss, so an entry torn by a concurrent write is never returned.  Bounds are integers (MTDfAgent's half-points) biased
+# into 16 bits, with the extremes standing for the infinities; moves are coordinate indices, PASS_MOVE or None.
+#
+# The process that creates the block owns it: its new_search() advances the shared generation and it unlinks the block
+# on close().  Processes that attach by name follow the owner's generation.
+
+_HEADER_WORDS = 8
+_GENERATION = 0
+_STOP = 1
+_BUCKET = 4
+_WORDS = 2
+
+_VALUE_BIAS = 0x8000
+_VALUE_NEGATIVE_INFINITY = 0
+_VALUE_POSITIVE_INFINITY = 0xFFFF
+_NEGATIVE_INFINITY = float('-inf')
+_POSITIVE_INFINITY = float('inf')
+
+
+def _encode_value(value):
+    if value == _NEGATIVE_INFINITY:
+        return _VALUE_NEGATIVE_INFINITY
+    if value == _POSITIVE_INFINITY:
+        return _VALUE_POSITIVE_INFINITY
+    code = int(value) + _VALUE_BIAS
+    assert 0 < code < _VALUE_POSITIVE_INFINITY
+    return code
+
+
+def _decode_value(code: int):
+    if code == _VALUE_NEGATIVE_INFINITY:
+        return _NEGATIVE_INFINITY
+    if code == _VALUE_POSITIVE_INFINITY:
+        return _POSITIVE_INFINITY
+    return code - _VALUE_BIAS
+
+
+def _encode_move(move):
+    return 0 if move is None else 1 if move == PASS_MOVE else move + 2
+
+
+def _decode_move(code: int):
+    return None if code == 0 else PASS_MOVE if code == 1 else code - 2
+
+
+class SharedTranspositionTable:
+    def __init__(self, size: int = 1 << 18, name: str = None):
+        assert size > 0
+        buckets = 1
+        while buckets * _BUCKET < size:
+            buckets <<= 1
+        self.capacity = buckets * _BUCKET
+        self._mask = buckets - 1
+        length = 8 * (_HEADER_WORDS + _WORDS * self.capacity)
+        self.owner = name is None
+        if self.owner:
+            self._memory = shared_memory.SharedMemory(create=True, size=length)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self.name = self._memory.name
+        self.size = size
+        self._words = self._memory.buf[:length].cast('Q')
+        if self.owner:
+            self._words[_GENERATION] = 0
+            self._words[_STOP] = 0
+        self.generation = self._words[_GENERATION]
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def new_search(self):
+        if self.owner:
+            self._words[_GENERATION] = (self._words[_GENERATION] + 1) & 0xFF
+            self._words[_STOP] = 0
+        self.generation = self._words[_GENERATION]
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.
+
+    @property
+    def stopped(self):
+        return self._words[_STOP] != 0
+
+    def stop(self):
+        self._words[_STOP] = 1
+
+    def probe(self, key: int):
+        self.probes += 1
+        words = self._words
+        start = _HEADER_WORDS + (key & self._mask) * _BUCKET * _WORDS
+        for slot in range(start, start + _BUCKET * _WORDS, _WORDS):
+            data = words[slot]
+            if data and words[slot + 1] ^ data == key:
+                self.hits += 1
+                return (
+                    data & 0xFF,
+                    _decode_value(data >> 16 & 0xFFFF),
+                    _decode_value(data >> 32 & 0xFFFF),
+                    _decode_move(data >> 48 & 0x3FF)
+                )
+        return None
+
+    def store(self, key: int, depth: int, lower: float, upper: float, move):
+        words = self._words
+        generation = self.generation
+        start = _HEADER_WORDS + (key & self._mask) * _BUCKET * _WORDS
+        target = None
+        target_rank = None
+        for slot in range(start, start + _BUCKET * _WORDS, _WORDS):
+            data = words[slot]
+            if data and words[slot + 1] ^ data == key:
+                if (data >> 8 & 0xFF) == generation and (data & 0xFF) > depth:
+                    return
+                target = slot
+                break
+            rank = ((data >> 8 & 0xFF) == generation, data & 0xFF) if data else (False, -1)
+            if target is None or rank < target_rank:
+                target = slot
+                target_rank = rank
+        else:
+            if words[target]:
+                self.overwrites += 1
+        self.stores += 1
+        data = (
+            min(depth, 0xFF) |
+            generation << 8 |
+            _encode_value(lower) << 16 |
+            _encode_value(upper) << 32 |
+            _encode_move(move) << 48
+        )
+        words[target + 1] = key ^ data
+        words[target] = data
+
+    def clear(self):
+        start = 8 * _HEADER_WORDS
+        end = 8 * (_HEADER_WORDS + _WORDS * self.capacity)
+        self._memory.buf[start:end] = bytes(end - start)
+
+    def close(self):
+        if self._words is None:
+            return
+        self._words.release()
+        self._words = None
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
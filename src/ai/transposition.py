@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# A fixed-size transposition table.  Entries live in parallel lists indexed by the low bits of their key, so the table
+# never grows past the size it was created with.  When two keys want the same slot, the entry from an older search or
+# with the shallower search depth is replaced.
+
+_MISSING = None
+
+
+class TranspositionTable:
+    def __init__(self, size: int = 1 << 18):
+        assert size > 0
+        capacity = 1
+        while capacity < size:
+            capacity <<= 1
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._keys = [_MISSING] * capacity
+        self._depths = [0] * capacity
+        self._lowers = [0] * capacity
+        self._uppers = [0] * capacity
+        self._moves = [None] * capacity
+        self._generations = [0] * capacity
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def new_search(self):
+        self.generation += 1
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.
+
+    def probe(self, key: int):
+        self.probes += 1
+        slot = key & self._mask
+        if self._keys[slot] != key:
+            return None
+        self.hits += 1
+        return self._depths[slot], self._lowers[slot], self._uppers[slot], self._moves[slot]
+
+    def store(self, key: int, depth: int, lower: float, upper: float, move):
+        slot = key & self._mask
+        stored = self._keys[slot]
+        if stored is not _MISSING:
+            if self._generations[slot] == self.generation and self._depths[slot] > depth:
+                return
+            if stored != key:
+                self.overwrites += 1
+        self.stores += 1
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._lowers[slot] = lower
+        self._uppers[slot] = upper
+        self._moves[slot] = move
+        self._generations[slot] = self.generation
+
+    def clear(self):
+        self._keys = [_MISSING] * self.capacity
+        self._depths = [0] * self.capacity
+        self._lowers = [0] * self.capacity
+        self._uppers = [0] * self.capacity
+        self._moves = [None] * self.capacity
+        self._generations = [0] * self.capacity
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import random
+import tracemalloc
+from go.coordinate import PASS
+from go.game import Game
+from go.position import Position
+
+# Measures how many bytes each child node costs when every legal move of a midgame position is expanded, comparing a
+# Game per child against a Position per child (before and after its legal-move bitmap has been derived).
+#
+#   python -m benchmarks.memory
+
+
+def _midgame(span: int, moves: int, seed: int):
+    rng = random.Random(seed)
+    game = Game(span=span, compensation=7)
+    for _ in range(moves):
+        candidates = sorted((move for move in game.legal_moves if move != PASS), key=lambda move: move.index)
+        game = game.play(rng.choice(candidates))
+    return game
+
+
+def _bytes_per_node(build):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    nodes = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(nodes), nodes
+
+
+def _expand(nodes):
+    for node in nodes:
+        node.legal
+    return nodes
+
+
+def run(span: int, moves: int, seed: int = 0):
+    game = _midgame(span, moves, seed)
+    root = Position.from_game(game)
+    root.legal
+    game_bytes, _ = _bytes_per_node(lambda: [game.play(move) for move in game.legal_moves])
+    position_bytes, children = _bytes_per_node(lambda: [root.play(move) for move in root.legal_moves()])
+    expanded_bytes, _ = _bytes_per_node(lambda: _expand(children))
+    return game_bytes, position_bytes, position_bytes + expanded_bytes
+
+
+if __name__ == '__main__':
+    print(f'{"board":>7} {"Game":>10} {"Position":>10} {"expanded":>10}')
+    for span, moves in ((9, 20), (19, 80)):
+        game_bytes, position_bytes, expanded_bytes = run(span, moves)
+        print(f'{span:>4}x{span:<2} {game_bytes:>10.0f} {position_bytes:>10.0f} {expanded_bytes:>10.0f}')
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import time
+from go import rules
+from go.coordinate import PASS, get_coordinates
+from go.game import Game
+from go.pointset import PointSet
+from go.search import SearchPosition
+
+# Perft for Go: from each seed position, walk every legal-move sequence (passes included) to a fixed depth and count
+# the nodes at each depth.  The counts depend on nothing but the rules, so they are an oracle for any rewrite of
+# legality, captures or Board: --reference recounts with Game._prepare_reference in place of the fast legality and must
+# reproduce them, as must the same walk made with SearchPosition.make_move and unmake_move.  Alongside the counts it
+# times Game.play and make/unmake over the walks, and Game.score and PointSet.sets over the leaves.  Results are checked
+# against perft.json: a changed count fails, and so does a rate more than the tolerance below its baseline.  The rates
+# are those of whatever machine last ran --update, so on a slower or busier one --no-timing-gate reports them instead.
+#
+#   python -m benchmarks.perft [--update] [--reference] [--no-timing-gate] [--tolerance 0.5] [--repeat 3] [position ...]
+
+BASELINES = os.path.join(os.path.dirname(__file__), 'perft.json')
+SCORED_LEAVES = 1000
+
+# The moves reaching the ko seed: White's stone at (2, 2) can be taken at (2, 3), after which it may not retake.
+_KO_MOVES = ((1, 2), (1, 3), (2, 1), (2, 4), (3, 2), (3, 3), (5, 5), (2, 2))
+# Three moves deep the ko seeds count the same under every rule set.  On 2x2 the stones keep capturing one another, and
+# by depth 8 positional superko, simple ko and situational superko each allow a different number of sequences.
+
+# name -> (rules, span, handicap placement, moves, depth); moves are (row, column) pairs, None for a pass.
+SEEDS = {
+    'empty-2': ('TRAINING', 2, (), (), 6),
+    'empty-3': ('TRAINING', 3, (), (), 4),
+    'empty-4': ('TRAINING', 4, (), (), 3),
+    'empty-9': ('TRAINING', 9, (), (), 2),
+    'ko-5': ('TRAINING', 5, (), _KO_MOVES, 3),
+    'ko-5-japanese': ('JAPANESE', 5, (), _KO_MOVES, 3),
+    'ko-5-tromp-taylor': ('TROMP_TAYLOR', 5, (), _KO_MOVES, 3),
+    'repeat-2': ('TRAINING', 2, (), (), 8),
+    'repeat-2-japanese': ('JAPANESE', 2, (), (), 8),
+    'repeat-2-aga': ('AGA', 2, (), (), 8),
+    'handicap-5': ('TRAINING', 5, ((2, 2), (4, 4)), (), 3),
+    'handicap-9': ('AGA', 9, ((3, 3), (7, 7)), (), 2),
+}
+
+
+def seed_game(name: str):
+    rule_set, span, handicap_placement, moves, _ = SEEDS[name]
+    coordinates = get_coordinates(span)
+    game = Game(
+        rules=getattr(rules, rule_set),
+        span=span,
+        compensation=7,
+        handicap_placement=[coordinates.get(row, column) for row, column in handicap_placement] or None
+    )
+    for move in moves:
+        game = game.play(PASS if move is None else coordinates.get(*move))
+    return game
+
+
+def _walk(game: Game, depth: int, counts: list, leaves: list):
+    if depth == len(counts):
+        if len(leaves) < SCORED_LEAVES:
+            leaves.append(game)
+        return
+    for move in game.legal_moves:
+        child = game.play(move)
+        counts[depth] += 1
+        if not child.over:
+            _walk(child, depth + 1, counts, leaves)
+
+
+def _walk_search(search: SearchPosition, depth: int, counts: list):
+    if depth == len(counts):
+        return
+    for move in search.legal_moves():
+        search.make_move(move)
+        counts[depth] += 1
+        if not search.over:
+            _walk_search(search, depth + 1, counts)
+        search.unmake_move()
+
+
+def _finish(game: Game):
+    while not game.over:
+        game = game.play(PASS)
+    return game
+
+
+def _rate(task, items: int):
+    start = time.perf_counter()
+    task()
+    return items / (time.perf_counter() - start)
+
+
+def run(name: str, repeat: int = 3):
+    # Each rate is the best of repeat runs, which is far steadier than a single run on a shared machine.
+    depth = SEEDS[name][4]
+    root = seed_game(name)
+    play = search = score = sets = 0
+    counts = None
+    for _ in range(repeat):
+        walked = [0] * depth
+        leaves = []
+        start = time.perf_counter()
+        _walk(root, 0, walked, leaves)
+        play = max(play, sum(walked) / (time.perf_counter() - start))
+        if counts is not None and walked != counts:
+            raise Exception(f'{name}: the same walk counted {walked} and then {counts}.')
+        counts = walked
+        searched = [0] * depth
+        start = time.perf_counter()
+        _walk_search(SearchPosition(root), 0, searched)
+        search = max(search, sum(searched) / (time.perf_counter() - start))
+        if searched != counts:
+            raise Exception(f'{name}: Game.play counted {counts} but SearchPosition counted {searched}.')
+        finished = [_finish(leaf) for leaf in leaves]
+        score = max(score, _rate(lambda: [game.score() for game in finished], len(finished)))
+        boards = [leaf.board for leaf in leaves]
+        sets = max(sets, _rate(lambda: [PointSet.sets(board) for board in boards], len(boards)))
+    return {'counts': counts, 'play': round(play), 'search': round(search), 'score': round(score), 'sets': round(sets)}
+
+
+def _use_reference():
+    Game._prepare = lambda game, board, *_: game._prepare_reference(board)
+
+
+def compare(name: str, result: dict, baseline: dict, tolerance: float, timed: bool = True):
+    # (count failures, rate failures): counts must match exactly and rates must stay within the tolerance.
+    counts = []
+    rates = []
+    if result['counts'] != baseline['counts']:
+        counts.append(f'{name}: counts {result["counts"]} differ from the baseline {baseline["counts"]}')
+    if timed:
+        for measure in ('play', 'search', 'score', 'sets'):
+            if measure in baseline and result[measure] < baseline[measure] * (1 - tolerance):
+                rates.append(
+                    f'{name}: {measure} ran at {result[measure]:.0f}/s against a baseline of {baseline[measure]:.0f}/s'
+                )
+    return counts, rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Counts and times every legal-move sequence from fixed seeds.')
+    parser.add_argument('positions', nargs='*', help=f'any of {", ".join(SEEDS)} (all of them by default)')
+    parser.add_argument('--update', action='store_true', help='store these results as the baselines')
+    parser.add_argument('--reference', action='store_true', help='count with Game._prepare_reference')
+    parser.add_argument('--no-timing-gate', action='store_true', help='report slow rates without failing on them')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='the fractional drop in a rate that fails')
+    parser.add_argument('--repeat', type=int, default=3, help='take each rate as the best of this many runs')
+    arguments = parser.parse_args()
+    positions = arguments.positions or list(SEEDS)
+    unknown = [name for name in positions if name not in SEEDS]
+    if unknown:
+        parser.error(f'unknown positions: {", ".join(unknown)}')
+    if arguments.update and arguments.reference:
+        parser.error('baselines are not taken from the reference legality')
+
+    if arguments.reference:
+        _use_reference()
+    baselines = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as stream:
+            baselines = json.load(stream)
+
+    failures = []
+    warnings = []
+    print(f'{"position":>18} {"depth":>5} {"nodes":>9} {"play/s":>9} {"search/s":>9} {"score/s":>9} {"sets/s":>9}')
+    for name in positions:
+        result = run(name, 1 if arguments.reference else arguments.repeat)
+        print(
+            f'{name:>18} {len(result["counts"]):>5} {sum(result["counts"]):>9} '
+            f'{result["play"]:>9.0f} {result["search"]:>9.0f} {result["score"]:>9.0f} {result["sets"]:>9.0f}'
+        )
+        if arguments.update:
+            baselines[name] = result
+        elif name in baselines:
+            counts, rates = compare(name, result, baselines[name], arguments.tolerance, not arguments.reference)
+            failures += counts
+            if arguments.no_timing_gate:
+                warnings += rates
+            else:
+                failures += rates
+        else:
+            failures.append(f'{name}: no baseline; run with --update to record one')
+
+    if arguments.update:
+        with open(BASELINES, 'w') as stream:
+            json.dump(baselines, stream, indent=2, sort_keys=True)
+            stream.write('\n')
+    if warnings:
+        print('Slower than the baselines (not failing, since --no-timing-gate was given):')
+        print('\n'.join(warnings))
+    if failures:
+        raise Exception('Perft regressions:\n' + '\n'.join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import random
+import time
+from go import rules
+from go.color import Color
+from go.coordinate import PASS
+from go.game import Game
+
+# Plays the same seeded random games (never filling a point that looks like an own eye) under each preset RuleSet, with
+# and without double hashing, and reports moves per second and the share of that time spent deciding legality, the
+# part that depends on the rules.
+#
+#   python -m benchmarks.rules
+
+PRESETS = ('AGA', 'CHINESE', 'JAPANESE', 'TRAINING', 'TROMP_TAYLOR')
+
+
+def _play(rule_set: rules.RuleSet, span: int, games: int, double_hash: bool, seed: int):
+    rng = random.Random(seed)
+    moves = 0
+    for _ in range(games):
+        game = Game(rules=rule_set, span=span, compensation=7, double_hash=double_hash)
+        while not game.over and game.moves_played < 3 * span * span:
+            eyes = game.board.bitboard.eyes(game.current_player)
+            candidates = sorted(
+                (coordinate.index for coordinate, color in game.board
+                 if color is Color.EMPTY and not eyes >> coordinate.index & 1)
+            )
+            game = game.play(game.board.coordinates[rng.choice(candidates)] if candidates else PASS)
+            moves += 1
+    return moves
+
+
+def run(rule_set: rules.RuleSet, span: int, games: int, double_hash: bool = False, seed: int = 0):
+    prepare = Game._prepare
+    spent = [0.]
+
+    def timed(game, *arguments):
+        start = time.perf_counter()
+        board = prepare(game, *arguments)
+        spent[0] += time.perf_counter() - start
+        return board
+
+    Game._prepare = timed
+    try:
+        start = time.perf_counter()
+        moves = _play(rule_set, span, games, double_hash, seed)
+        elapsed = time.perf_counter() - start
+    finally:
+        Game._prepare = prepare
+    return moves / elapsed, spent[0] / elapsed
+
+
+if __name__ == '__main__':
+    print(f'{"rules":>13} {"hashes":>6} {"moves/s":>9} {"legality":>9}')
+    for name in PRESETS:
+        for double_hash in (False, True):
+            rate, share = run(getattr(rules, name), 9, 20, double_hash)
+            print(f'{name:>13} {2 if double_hash else 1:>6} {rate:>9.0f} {share:>9.0%}')
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+from .color import Color
+from .constants import MAX_SPAN
+from .coordinate import get_coordinates
+
+# A Board as Python-int bitmasks: bit n stands for the Coordinate with index n.  Shifting a mask by one moves every
+# point a column and by span moves it a row, so with the edge masks (which drop whatever would wrap around a row)
+# neighbors of a whole set of points take four shifts, a chain or region is a flood fill of such steps, and liberties,
+# captures and eyes follow from a handful of mask operations instead of walking Coordinates.
+
+_EMPTY = Color.EMPTY.index
+_BLACK = Color.BLACK.index
+_WHITE = Color.WHITE.index
+_UNPLAYABLE = Color.UNPLAYABLE.index
+
+
+def _table(value: int):
+    return bytes(ord('1') if cell == value else ord('0') for cell in range(256))
+
+
+_BITS = {color: _table(color) for color in (_BLACK, _WHITE, _UNPLAYABLE)}
+
+
+class Masks:
+    # The per-span masks: every point, and every point but the first or the last column.
+    def __init__(self, span: int):
+        assert 1 <= span <= MAX_SPAN
+        self.span = span
+        self.full = (1 << span * span) - 1
+        first_column = 0
+        last_column = 0
+        for coordinate in get_coordinates(span):
+            if coordinate.column == 1:
+                first_column |= 1 << coordinate.index
+            if coordinate.column == span:
+                last_column |= 1 << coordinate.index
+        self.not_first_column = self.full & ~first_column
+        self.not_last_column = self.full & ~last_column
+        self.edge = first_column | last_column | (1 << span) - 1 | ((1 << span) - 1) << span * (span - 1)
+
+    def neighbors(self, mask: int):
+        span = self.span
+        return (
+            (mask << 1 & self.not_first_column) |
+            (mask >> 1 & self.not_last_column) |
+            (mask << span & self.full) |
+            mask >> span
+        )
+
+    def diagonals(self, mask: int):
+        # The mask moved one step along each of the four diagonals.
+        span = self.span
+        down = mask << span & self.full
+        up = mask >> span
+        return (
+            down << 1 & self.not_first_column,
+            down >> 1 & self.not_last_column,
+            up << 1 & self.not_first_column,
+            up >> 1 & self.not_last_column
+        )
+
+    def corners(self, mask: int):
+        first, second, third, fourth = self.diagonals(mask)
+        return first | second | third | fourth
+
+    def flood(self, seeds: int, within: int):
+        filled = seeds & within
+        frontier = filled
+        while frontier:
+            frontier = self.neighbors(frontier) & within & ~filled
+            filled |= frontier
+        return filled
+
+
+_MASKS = {}
+
+
+def get_masks(span: int):
+    if span not in _MASKS:
+        _MASKS[span] = Masks(span)
+    return _MASKS[span]
+
+
+def indices(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Bitboard:
+    def __init__(self, span: int, black: int, white: int, unplayable: int):
+        self.masks = get_masks(span)
+        self.span = span
+        self.black = black
+        self.white = white
+        self.unplayable = unplayable
+        self.stones = black | white
+        self.open = self.masks.full & ~self.stones
+        self._eyes = {}
+
+    @staticmethod
+    def from_cells(span: int, cells):
+        # Bit n is cell n, so the cells are reversed before they are read as a binary number.
+        reversed_cells = bytes(cells)[::-1]
+        return Bitboard(
+            span,
+            int(reversed_cells.translate(_BITS[_BLACK]), 2),
+            int(reversed_cells.translate(_BITS[_WHITE]), 2),
+            int(reversed_cells.translate(_BITS[_UNPLAYABLE]), 2)
+        )
+
+    def mask(self, color: Color):
+        # The points of a color, with UNPLAYABLE points counted as EMPTY (Color.simple).
+        if color is Color.BLACK:
+            return self.black
+        if color is Color.WHITE:
+            return self.white
+        return self.open
+
+    def region(self, index: int):
+        # The chain or empty region containing a point.
+        bit = 1 << index
+        for within in (self.black, self.white, self.open):
+            if within & bit:
+                return self.masks.flood(bit, within)
+        return 0
+
+    def liberties(self, chain: int):
+        return self.masks.neighbors(chain) & self.open
+
+    def captures(self, index: int, color: Color):
+        # The opponent stones a stone of color at index would capture.
+        bit = 1 << index
+        opponents = self.white if color is Color.BLACK else self.black
+        open_points = self.open & ~bit
+        captured = 0
+        remaining = self.masks.neighbors(bit) & opponents
+        while remaining:
+            chain = self.masks.flood(remaining & -remaining, opponents)
+            remaining &= ~chain
+            if not self.masks.neighbors(chain) & open_points:
+                captured |= chain
+        return captured
+
+    def eyes(self, color: Color):
+        # Every point that passes the rule NaiveAgent uses: an open point whose neighbors are all friendly stones and
+        # with 3 of its 4 diagonals friendly (all of them at the edge).  A point has an unfriendly diagonal in a
+        # direction when the unfriendly points moved along that direction cover it.
+        if color not in self._eyes:
+            masks = self.masks
+            unfriendly = masks.full & ~self.mask(color)
+            first, second, third, fourth = masks.diagonals(unfriendly)
+            any_unfriendly = first | second | third | fourth
+            two_unfriendly = (
+                (first | second) & (third | fourth) |
+                first & second |
+                third & fourth
+            )
+            self._eyes[color] = (
+                self.open &
+                ~masks.neighbors(unfriendly) &
+                ~two_unfriendly &
+                ~(masks.edge & any_unfriendly)
+            )
+        return self._eyes[color]
+
+    def is_eye(self, index: int, color: Color):
+        return bool(self.eyes(color) >> index & 1)
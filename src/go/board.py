@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
 
+from operator import xor
 from . import constants, zobrist
-from .color import Color
-from .coordinate import get_coordinates, Coordinate, Coordinates
+from .color import Color, COLORS
+from .coordinate import get_coordinates, Coordinate, Coordinates, SYMMETRIES
+from .bitboard import Bitboard
+from .group import Group
+
+
+_LIBERTIES = tuple(color.counts_as_liberty for color in COLORS)
+_UNMARK = bytes.maketrans(bytes([Color.UNPLAYABLE.index]), bytes([Color.EMPTY.index]))
 
 
 class Board:
+    # Cells hold Color.index values in a flat bytearray ordered like Coordinates.  A copy shares its source's cells and
+    # Group records until either Board is written to, at which point the writer takes its own copy.  Alongside position,
+    # symmetric_positions holds the hash of the board under each of the 8 symmetries (see Coordinates.symmetries), so
+    # rotations and reflections of a position share canonical().  check is a second, independent hash of the same
+    # cells (see zobrist.get_check_hashes) that History keeps to confirm position matches.  enclosed is a bitmask (by
+    # Coordinate index) of the empty points with no empty neighbor, kept up to date around every write, since those are
+    # the only points where a move can be suicide.
     def __init__(
         self,
         span: int = None,
@@ -15,26 +29,197 @@ class Board:
             assert span is not None and 1 <= span <= constants.MAX_SPAN
             self.coordinates = get_coordinates(span)
             self.span = span
-            self.cells = {coordinate: Color.EMPTY for coordinate in self.coordinates}
+            self.cells = bytearray([Color.EMPTY.index]) * len(self.coordinates)
             self.position = zobrist.get_empty_board(span)
+            self.symmetric_positions = (self.position,) * SYMMETRIES
+            self.check = zobrist.get_empty_check(span)
+            self.enclosed = sum(
+                1 << index for index, neighbors in enumerate(self.coordinates.neighbor_indices) if not neighbors
+            )
+            self._groups = [None] * len(self.coordinates)
+            self._shared = False
         else:
             assert isinstance(source, Board)
             self.coordinates = source.coordinates
             self.span = source.span
-            self.cells = {k: v for k, v in source.cells.items()}
+            self.cells = source.cells
             self.position = source.position
+            self.symmetric_positions = source.symmetric_positions
+            self.check = source.check
+            self.enclosed = source.enclosed
+            self._groups = source._groups
+            self._shared = source._shared = True
+        self._hashes = zobrist.get_cell_hashes(self.span)
+        self._checks = zobrist.get_check_hashes(self.span)
+        self._bitboard = source._bitboard if source is not None else None
+        self._symmetric_deltas = zobrist.get_symmetric_deltas(self.span)
+
+    def _own(self):
+        if self._shared:
+            self.cells = bytearray(self.cells)
+            self._groups = self._groups[:]
+            self._shared = False
+
+    def _locate(self, coordinate: Coordinate):
+        # Only this board's own Coordinates carry an index into cells.  Any other (built by hand, or from another span)
+        # is matched by row and column, and a point off the board raises KeyError as the dict of cells did.
+        if coordinate not in self.coordinates:
+            raise KeyError(coordinate)
+        return self.coordinates.get(coordinate.row, coordinate.column)
 
     def __getitem__(self, coordinate: Coordinate):
-        return self.cells[coordinate]
+        index = coordinate.index
+        if index is None or index >= len(self.cells) or self.coordinates.points[index] is not coordinate:
+            index = self._locate(coordinate).index
+        return COLORS[self.cells[index]]
 
     def __setitem__(self, coordinate: Coordinate, next_color: Color):
-        current_color = self.cells[coordinate]
-        if current_color != next_color:
-            current_hash = zobrist.get_cell_hash(coordinate, current_color.simple)
-            next_hash = zobrist.get_cell_hash(coordinate, next_color.simple)
-            if current_hash != next_hash:
-                self.position ^= current_hash ^ next_hash
-            self.cells[coordinate] = next_color
+        index = coordinate.index
+        if index is None or index >= len(self.cells) or self.coordinates.points[index] is not coordinate:
+            coordinate = self._locate(coordinate)
+            index = coordinate.index
+        current = self.cells[index]
+        following = next_color.index
+        if current != following:
+            self._own()
+            self._bitboard = None
+            hashes = self._hashes[index]
+            self.position ^= hashes[current] ^ hashes[following]
+            checks = self._checks[index]
+            self.check ^= checks[current] ^ checks[following]
+            deltas = self._symmetric_deltas[index][current][following]
+            self.symmetric_positions = tuple(map(xor, self.symmetric_positions, deltas))
+            self.cells[index] = following
+            if _LIBERTIES[current] != _LIBERTIES[following]:
+                self._enclose((index,))
+            if not _LIBERTIES[current]:
+                self._lift(coordinate)
+            if not next_color.counts_as_liberty:
+                self._place(coordinate, next_color)
+
+    def _enclose(self, changed):
+        # Works out the enclosed bits of the points whose liberty status changed and of their neighbors.
+        cells = self.cells
+        neighbor_indices = self.coordinates.neighbor_indices
+        enclosed = self.enclosed
+        for index in changed:
+            for point in (index, *neighbor_indices[index]):
+                if _LIBERTIES[cells[point]] and not any(_LIBERTIES[cells[other]] for other in neighbor_indices[point]):
+                    enclosed |= 1 << point
+                else:
+                    enclosed &= ~(1 << point)
+        self.enclosed = enclosed
+
+    def unmark(self):
+        # Turns every UNPLAYABLE point back into EMPTY.  Both hash alike and both are liberties, so neither the hashes
+        # nor the groups change.
+        if Color.UNPLAYABLE.index in self.cells:
+            self._own()
+            self._bitboard = None
+            self.cells = bytearray(self.cells.translate(_UNMARK))
+
+    def canonical(self):
+        # The smallest of the symmetric hashes and the symmetry that produces it: boards that are rotations or
+        # reflections of one another share the hash, and transforming a move by the symmetry puts it on the canonical
+        # board.
+        positions = self.symmetric_positions
+        symmetry = min(range(SYMMETRIES), key=positions.__getitem__)
+        return positions[symmetry], symmetry
+
+    @property
+    def bitboard(self):
+        # A Bitboard of the current cells, built on first use and kept until the next write.
+        if self._bitboard is None:
+            self._bitboard = Bitboard.from_cells(self.span, self.cells)
+        return self._bitboard
+
+    def group(self, coordinate: Coordinate):
+        index = coordinate.index
+        if index is None or index >= len(self.cells) or self.coordinates.points[index] is not coordinate:
+            index = self._locate(coordinate).index
+        return self._groups[index]
+
+    @property
+    def groups(self):
+        groups = set(self._groups)
+        groups.discard(None)
+        return groups
+
+    def remove(self, group: Group):
+        self._own()
+        self._bitboard = None
+        hashes = self._hashes
+        checks = self._checks
+        deltas = self._symmetric_deltas
+        stone = group.color.index
+        empty = Color.EMPTY.index
+        freed = {}
+        for member in group.members:
+            index = member.index
+            self.position ^= hashes[index][stone] ^ hashes[index][empty]
+            self.check ^= checks[index][stone] ^ checks[index][empty]
+            self.symmetric_positions = tuple(map(xor, self.symmetric_positions, deltas[index][stone][empty]))
+            self.cells[index] = empty
+            self._groups[index] = None
+        self._enclose([member.index for member in group.members])
+        for member in group.members:
+            for neighbor in member.neighbors:
+                other = self._groups[neighbor.index]
+                if other is not None:
+                    freed.setdefault(other, set()).add(member)
+        for other, liberties in freed.items():
+            self._assign(Group(other.color, other.members, other.liberties | liberties))
+
+    def _assign(self, group: Group):
+        for member in group.members:
+            self._groups[member.index] = group
+
+    def _place(self, coordinate: Coordinate, color: Color):
+        members = {coordinate}
+        liberties = set()
+        adjacent = []
+        for neighbor in coordinate.neighbors:
+            other = self._groups[neighbor.index]
+            if other is None:
+                liberties.add(neighbor)
+            elif other not in adjacent:
+                adjacent.append(other)
+        for other in adjacent:
+            if other.color is color:
+                members |= other.members
+                liberties |= other.liberties
+            else:
+                self._assign(Group(other.color, other.members, other.liberties - {coordinate}))
+        liberties.discard(coordinate)
+        self._assign(Group(color, frozenset(members), frozenset(liberties)))
+
+    def _lift(self, coordinate: Coordinate):
+        group = self._groups[coordinate.index]
+        self._groups[coordinate.index] = None
+        remaining = set(group.members)
+        remaining.discard(coordinate)
+        adjacent = []
+        for neighbor in coordinate.neighbors:
+            other = self._groups[neighbor.index]
+            if other is not None and other.color is not group.color and other not in adjacent:
+                adjacent.append(other)
+        for other in adjacent:
+            self._assign(Group(other.color, other.members, other.liberties | {coordinate}))
+        while remaining:
+            start = remaining.pop()
+            members = {start}
+            liberties = set()
+            to_visit = [start]
+            while to_visit:
+                current = to_visit.pop()
+                for neighbor in current.neighbors:
+                    if neighbor in remaining:
+                        remaining.discard(neighbor)
+                        members.add(neighbor)
+                        to_visit.append(neighbor)
+                    elif _LIBERTIES[self.cells[neighbor.index]]:
+                        liberties.add(neighbor)
+            self._assign(Group(group.color, frozenset(members), frozenset(liberties)))
 
     def __eq__(self, other):
         return (
@@ -58,7 +243,7 @@ class Board:
 
             for column in range(1, self.span + 1):
                 coordinate = self.coordinates.get(row, column)
-                color = self.cells[coordinate]
+                color = self[coordinate]
                 if color is Color.EMPTY:
                     left_edge = column == 1
                     right_edge = column == self.span
@@ -98,9 +283,8 @@ class Board:
         return '   ' + 'ABCDEFGHJKLMNOPQRST'[:self.span] + '\n'
 
     def __iter__(self):
-        for coordinate in self.coordinates:
-            color = self[coordinate]
-            yield coordinate, color
+        for coordinate, index in zip(self.coordinates, self.cells):
+            yield coordinate, COLORS[index]
 
     def __contains__(self, coordinate: Coordinate):
         return coordinate in self.coordinates
@@ -19,3 +19,5 @@ class Color(Enum):
 Color.BLACK.inverse = Color.WHITE
 Color.WHITE.inverse = Color.BLACK
 Color.UNPLAYABLE.simple = Color.EMPTY
+
+COLORS = tuple(sorted(Color, key=lambda color: color.index))
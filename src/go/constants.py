@@ -2,3 +2,5 @@
 
 MAX_SPAN = 19
 ZOBRIST_HASH_SIZE = 64
+ZOBRIST_SEED = 0x5A0B215
+ZOBRIST_CHECK_SEED = 0xC4EC6
@@ -5,9 +5,10 @@ from typing import List
 
 
 class Coordinate:
-    def __init__(self, row: int, column: int):
+    def __init__(self, row: int, column: int, index: int = None):
         self.row = row
         self.column = column
+        self.index = index
         self.neighbors: List[Coordinate] = []
         self.corners: List[Coordinate] = []
         self._hash = hash((self.row, self.column))
@@ -27,11 +28,37 @@ class Coordinate:
     def __hash__(self):
         return self._hash
 
+# The 8 symmetries of a square board are numbered by three bits applied in this order: 4 transposes rows and columns,
+# then 1 reverses the rows and 2 reverses the columns.  Coordinates.symmetries[symmetry][index] is the index a point
+# moves to.
+SYMMETRIES = 8
+
+
+def _transform(row: int, column: int, span: int, symmetry: int):
+    if symmetry & 4:
+        row, column = column, row
+    if symmetry & 1:
+        row = span + 1 - row
+    if symmetry & 2:
+        column = span + 1 - column
+    return row, column
+
+
+def inverse_symmetry(symmetry: int):
+    if symmetry & 4:
+        return 4 | (symmetry & 1) << 1 | (symmetry & 2) >> 1
+    return symmetry
+
+
 class Coordinates:
     def __init__(self, span: int):
         assert 1 <= span <= MAX_SPAN
         self.span = span
-        self._coordinates = [Coordinate(row, column) for row in range(1, span + 1) for column in range(1, span + 1)]
+        self._coordinates = [
+            Coordinate(row, column, self._calculate_index(row, column))
+            for row in range(1, span + 1)
+            for column in range(1, span + 1)
+        ]
         for coordinate in self._coordinates:
             for pair in [
                 (coordinate.row - 1, coordinate.column),
@@ -55,6 +82,20 @@ class Coordinates:
                     index = self._calculate_index(row, column)
                     other = self._coordinates[index]
                     coordinate.corners.append(other)
+        # points[coordinate.index] is coordinate only for these Coordinates, not for an equal one built by hand or one
+        # from another span.
+        self.points = tuple(self._coordinates)
+        self.neighbor_indices = tuple(
+            tuple(neighbor.index for neighbor in coordinate.neighbors) for coordinate in self._coordinates
+        )
+        self.corner_indices = tuple(
+            tuple(corner.index for corner in coordinate.corners) for coordinate in self._coordinates
+        )
+        self.symmetries = tuple(
+            tuple(self._calculate_index(*_transform(coordinate.row, coordinate.column, span, symmetry))
+                  for coordinate in self._coordinates)
+            for symmetry in range(SYMMETRIES)
+        )
 
     def _validate_coordinate(self, row: int, column: int):
         return self._validate_component(row) and self._validate_component(column)
@@ -65,6 +106,11 @@ class Coordinates:
     def _calculate_index(self, row: int, column: int):
         return (row - 1) * self.span + column - 1
 
+    def transform(self, coordinate: Coordinate, symmetry: int):
+        if coordinate.index is None:
+            return coordinate
+        return self._coordinates[self.symmetries[symmetry][coordinate.index]]
+
     def get(self, row: int, column: int):
         self._validate_coordinate(row, column)
         index = self._calculate_index(row, column)
@@ -73,6 +119,12 @@ class Coordinates:
     def __iter__(self):
         return iter(self._coordinates)
 
+    def __len__(self):
+        return len(self._coordinates)
+
+    def __getitem__(self, index: int):
+        return self._coordinates[index]
+
     def __contains__(self, coordinate: Coordinate):
         return coordinate and self._validate_coordinate(coordinate.row, coordinate.column)
 
@@ -4,16 +4,23 @@ from typing import Iterable
 from . import constants
 from .board import Board
 from .coordinate import *
+from .history import History
+from .legality import mark_unplayable
 from .outcome import *
 from .pointset import PointSet
-# from .rules import * # I might support multiple rule sets some day.
+from .rules import *
+from .scoring import get_scoring_engine
+
+_UNMARK = bytes.maketrans(bytes([Color.UNPLAYABLE.index]), bytes([Color.EMPTY.index]))
 
 
 class Game:
+    # A Game is built from the Board its move left behind, with no UNPLAYABLE marks.  Whatever derives from it (the
+    # marked board, legal_moves, the empty regions) is worked out on first use and cached, so a Game that is only
+    # scored, passed through or pruned by a search never pays for its legality scan.
     def __init__(
         self,
         # initial construction arguments
-        # rules: RuleSet = None,
         span: int = 0,
         compensation: float = 0,
         handicap_placement: Iterable[Coordinate] = None,
@@ -25,7 +32,14 @@ class Game:
         outcome: Outcome = InProgress.INSTANCE,
         # game ending arguments
         dead_black_stones: int = 0,
-        dead_white_stones: int = 0
+        dead_white_stones: int = 0,
+        *,
+        # arguments added since, keyword-only so that positional calls keep their meaning
+        rules: RuleSet = None,
+        double_hash: bool = False,
+        suicided_stones: int = 0,
+        emptied: int = 0,
+        history: History = None
     ):
         assert (
             (1 <= span <= constants.MAX_SPAN) or
@@ -38,7 +52,7 @@ class Game:
             )
         )
         if span:
-            self.board = Board(span=span)
+            self._board = Board(span=span)
             self.captures_by_black = 0
             self.captures_by_white = 0
             self.compensation = compensation
@@ -48,16 +62,17 @@ class Game:
             self.outcome = InProgress.INSTANCE
             self.previous_move = None
             self.previous_state = None
-            # self.rules = rules
-
-            self.history = {
-                self.board.position: [self.board]
-            }
+            self.rules = rules if rules is not None else TRAINING
+            self.double_hash = double_hash
+            self._emptied = 0
+            self._all_emptied = 0
 
             for coordinate in self.handicap_stones:
-                self.board[coordinate] = Color.BLACK
+                self._board[self._board.coordinates.get(coordinate.row, coordinate.column)] = Color.BLACK
+
+            self.history = History().add(self._board.position, (self._board.check, self.current_player))
         elif outcome.over and outcome.margin is not None:
-            self.board = board
+            self._board = board
             self.captures_by_black = source.captures_by_black + dead_black_stones
             self.captures_by_white = source.captures_by_white + dead_white_stones
             self.compensation = source.compensation
@@ -68,8 +83,12 @@ class Game:
             self.history = source.history
             self.previous_move = source.previous_move
             self.previous_state = source
+            self.rules = source.rules
+            self.double_hash = source.double_hash
+            self._emptied = source._emptied
+            self._all_emptied = source._all_emptied
         else:
-            self.board = board
+            self._board = board
             self.captures_by_black = source.captures_by_black
             self.captures_by_white = source.captures_by_white
             self.compensation = source.compensation
@@ -79,31 +98,46 @@ class Game:
             self.outcome = outcome
             self.previous_move = move
             self.previous_state = source
+            self.rules = source.rules
+            self.double_hash = source.double_hash
+            self.history = history if history is not None else source.history
+            # The bitmasks of the points this move's captures (or suicide) emptied and of those every move has.
+            self._emptied = emptied
+            self._all_emptied = source._all_emptied | emptied
 
             if additional_captures:
                 if source.current_player is Color.BLACK:
                     self.captures_by_black += additional_captures
                 else:
                     self.captures_by_white += additional_captures
-
-            if move is PASS:
-                self.history = source.history
-            else:
-                self.history = {k: v for k, v in source.history.items()}
-                position_hash = board.position
-                if board.position in self.history:
-                    self.history[position_hash] = (board, source.history[board.position])
+            if suicided_stones:
+                if source.current_player is Color.BLACK:
+                    self.captures_by_white += suicided_stones
                 else:
-                    self.history[position_hash] = (board, None)
+                    self.captures_by_black += suicided_stones
 
-        if self.outcome.over:
-            self._legal_moves = frozenset()
-        else:
-            legal_moves = [coordinate for coordinate, color in self.board if color is Color.EMPTY]
-            legal_moves.append(PASS)
-            self.legal_moves = frozenset(legal_moves)
+        # The first position of a Game has nothing to mark, and a finished Game has no one left to move.
+        self._marked = self._board if self.previous_state is None or self.outcome.over else None
+        self._legal_moves = None
+        self._regions = None
+
+    @property
+    def board(self):
+        # The Board with every point the player to move may not play marked UNPLAYABLE.
+        if self._marked is None:
+            self._marked = self.previous_state._prepare(self._board, self.history, self.ko_point, self._repeatable())
+        return self._marked
 
-        self._groups, self._group_map = PointSet.sets(self.board)
+    @property
+    def legal_moves(self):
+        if self._legal_moves is None:
+            if self.over:
+                self._legal_moves = frozenset()
+            else:
+                legal_moves = [coordinate for coordinate, color in self.board if color is Color.EMPTY]
+                legal_moves.append(PASS)
+                self._legal_moves = frozenset(legal_moves)
+        return self._legal_moves
 
     @property
     def over(self):
@@ -117,26 +151,67 @@ class Game:
     def handicap(self):
         return len(self.handicap_stones) if self.handicap_stones else 0
 
+    @property
+    def ko_point(self):
+        # The point of a single stone just captured by a single stone that was left with that point as its only
+        # liberty, i.e. where the opponent would immediately recapture.
+        previous = self.previous_state
+        if self.over or previous is None or self.previous_move is None or self.previous_move is PASS:
+            return None
+        captured = (
+            self.captures_by_black - previous.captures_by_black +
+            self.captures_by_white - previous.captures_by_white
+        )
+        return Game._find_ko_point(self._board, self.previous_move, captured)
+
+    @staticmethod
+    def _find_ko_point(board: Board, move: Coordinate, captured: int):
+        if captured != 1:
+            return None
+        group = board.group(move)
+        if group is None or len(group) != 1 or len(group.liberties) != 1:
+            return None
+        (point,) = group.liberties
+        return point
+
     def __getitem__(self, coordinate: Coordinate):
-        return self._group_map[coordinate]
+        group = self._board.group(coordinate)
+        return group if group is not None else self._empty_regions()[coordinate]
 
     @property
     def groups(self):
-        return set([group for group in self._groups if not group.color.counts_as_liberty])
+        return self._board.groups
 
     @property
     def point_sets(self):
-        return set(self._groups)
+        return self._board.groups | set(self._empty_regions().values())
 
-    def play(self, move: Coordinate):
-        self._validate_move(move)
+    def _empty_regions(self):
+        if self._regions is None:
+            self._regions = {}
+            for coordinate, color in self._board:
+                if color.counts_as_liberty and coordinate not in self._regions:
+                    region = PointSet(self._board, coordinate)
+                    for member in region:
+                        self._regions[member] = region
+        return self._regions
+
+    def play(self, move: Coordinate, validate: bool = True):
+        # validate=False skips the legality check (and the legality scan it needs) for a move already known to be legal,
+        # such as one from a game replayed elsewhere; an illegal move then makes a Game the rules would not allow.
+        if move != PASS and move in self._board:
+            move = self._board.coordinates.get(move.row, move.column)
+        if validate:
+            self._validate_move(move)
+        elif self.outcome is not InProgress.INSTANCE:
+            raise Exception("This Game is over; no further moves may be made (including passes).")
         return self._move_pass() if move == PASS else self._move_board(move)
 
     def _validate_move(self, move: Coordinate):
         if self.outcome is not InProgress.INSTANCE:
             raise Exception("This Game is over; no further moves may be made (including passes).")
         elif not move == PASS:
-            if move not in self.board.coordinates:
+            if move not in self._board.coordinates:
                 raise Exception(f"{move} is not on this Game's Board.")
             elif self.board[move] is not Color.EMPTY:
                 raise Exception(f"{move} is not playable.")
@@ -145,12 +220,81 @@ class Game:
         return self._pass_but_continue() if self.previous_move != PASS else self._pass_and_end()
 
     def _pass_but_continue(self):
-        next_board = self._prepare(self.board)
-        return Game(source=self, move=PASS, additional_captures=0, board=next_board, outcome=InProgress.INSTANCE)
+        return Game(
+            source=self,
+            move=PASS,
+            additional_captures=0,
+            board=self._board,
+            history=self._record(self._board, PASS),
+            outcome=InProgress.INSTANCE
+        )
 
-    def _prepare(self, board: Board):
+    def _record(self, board: Board, move: Coordinate):
+        # The History once board has been reached by move.  A pass repeats the position, which only situational superko
+        # tells apart (by the player to move).
+        if move is PASS and self.rules.ko is not Ko.SITUATIONAL:
+            return self.history
+        return self.history.add(board.position, (board.check, self.current_player.inverse))
+
+    def _recent(self):
+        # The hashes of positions the next player may not make beyond the ko point: the one from two moves back under
+        # send-two-return-one, and the current one where a suicide could recreate it without superko to forbid it.
+        rules = self.rules
+        recent = ()
+        if rules.ko is Ko.SEND_TWO_RETURN_ONE and self.previous_state is not None:
+            recent += (self.previous_state._board.position,)
+        if rules.suicide is Suicide.YES and rules.ko in (Ko.SIMPLE, Ko.SEND_TWO_RETURN_ONE):
+            recent += (self._board.position,)
+        return recent
+
+    def _repeatable(self):
+        # The points where the player to move could recreate a position the rules forbid (see legality): under superko
+        # any point ever emptied, and otherwise those emptied by the last two moves, which covers the positions
+        # _recent() names.
+        if self.rules.ko is Ko.POSITIONAL or self.rules.ko is Ko.SITUATIONAL:
+            return self._all_emptied
+        return self._emptied | self.previous_state._emptied
+
+    def _prepare(self, board: Board, history: History, ko_point: Coordinate = None, repeatable: int = 0):
+        # Marks board, the one the next Game starts from, for the player after this Game's.
+        return mark_unplayable(
+            board,
+            self.current_player.inverse,
+            history,
+            self.rules,
+            ko_point,
+            self._recent(),
+            self.double_hash,
+            repeatable
+        )
+
+    def _forbidden_positions(self, board: Board, next_player: Color):
+        # The unmarked cells of every position the rules forbid next_player to make.
+        rules = self.rules
+        if rules.ko is Ko.SIMPLE:
+            states = [self]
+        elif rules.ko is Ko.SEND_TWO_RETURN_ONE:
+            states = [self] if self.previous_state is None else [self, self.previous_state]
+        else:
+            states = []
+            state = self
+            while state is not None:
+                states.append(state)
+                state = state.previous_state
+        forbidden = [
+            state._board for state in states
+            if rules.ko is not Ko.SITUATIONAL or state.current_player is next_player.inverse
+        ]
+        if rules.ko is Ko.POSITIONAL:
+            forbidden.append(board)
+        return {bytes(position.cells.translate(_UNMARK)) for position in forbidden}
+
+    def _prepare_reference(self, board: Board):
+        # The original full-board scan, comparing whole boards.  It is far too slow for play, but it is the definition
+        # mark_unplayable() must agree with.
         next_board = Board(source=board)
         next_player = self.current_player.inverse
+        forbidden = self._forbidden_positions(board, next_player)
         for coordinate, color in board:
             if color.counts_as_liberty:
                 playable = True
@@ -160,49 +304,62 @@ class Game:
                 if not captures:
                     group = PointSet(scratch_pad, coordinate)
                     if not group.reaches[Color.EMPTY]:
-                        playable = False
-                if playable and scratch_pad.position in self.history:
-                    cons = self.history[scratch_pad.position]
-                    while playable and cons:
-                        playable = scratch_pad != cons[0]
-                        cons = cons[1]
+                        if self.rules.suicide is Suicide.YES:
+                            scratch_pad.remove(scratch_pad.group(coordinate))
+                        else:
+                            playable = False
+                if playable:
+                    playable = bytes(scratch_pad.cells.translate(_UNMARK)) not in forbidden
                 next_color = Color.EMPTY if playable else Color.UNPLAYABLE
                 next_board[coordinate] = next_color
         return next_board
 
     @staticmethod
     def _remove_captures(board: Board, start: Coordinate, played_by: Color):
-        captures = 0
+        # Removes the groups a stone played at start captured and returns them.
+        captured = []
         other = played_by.inverse
         for coordinate in start.neighbors:
-            color = board[coordinate]
-            if color is other:
-                group = PointSet(board, coordinate)
-                if not group.reaches[Color.EMPTY]:
-                    captures += len(group)
-                    for member in group.members:
-                        board[member] = Color.EMPTY
-        return captures
+            group = board.group(coordinate)
+            if group is not None and group.color is other and not group.liberties:
+                captured.append(group)
+                board.remove(group)
+        return captured
 
     def _pass_and_end(self):
         return Game(
             source=self,
             move=PASS,
             additional_captures=0,
-            board=self.board,
+            board=self._board,
             outcome=CompleteButNotScored.INSTANCE
         )
 
     def _move_board(self, move: Coordinate):
-        next_board = Board(source=self.board)
+        next_board = Board(source=self._board)
         next_board[move] = self.current_player
-        additional_captures = Game._remove_captures(next_board, move, self.current_player)
-        next_board = self._prepare(next_board)
+        removed = Game._remove_captures(next_board, move, self.current_player)
+        additional_captures = sum(len(group) for group in removed)
+        suicided_stones = 0
+        if not removed:
+            group = next_board.group(move)
+            if not group.liberties:
+                # Only reachable when the rules allow suicide; otherwise the point was marked UNPLAYABLE.
+                suicided_stones = len(group)
+                next_board.remove(group)
+                removed = [group]
+        emptied = 0
+        for group in removed:
+            for member in group.members:
+                emptied |= 1 << member.index
         return Game(
             source=self,
             move=move,
             additional_captures=additional_captures,
+            suicided_stones=suicided_stones,
+            emptied=emptied,
             board=next_board,
+            history=self._record(next_board, move),
             outcome=InProgress.INSTANCE
         )
 
@@ -211,7 +368,7 @@ class Game:
             raise Exception('score() may only be called on games that are complete but not scored.')
         dead_black_stones = 0
         dead_white_stones = 0
-        clean = Board(source=self.board)
+        clean = Board(source=self._board)
         if dead_groups:
             for group in dead_groups:
                 count = len(group)
@@ -221,36 +378,8 @@ class Game:
                     dead_white_stones += count
                 for coordinate in group:
                     clean[coordinate] = Color.EMPTY
-        for coordinate, color in clean:
-            if color is Color.UNPLAYABLE:
-                clean[coordinate] = Color.EMPTY
-        black_points_on_board = 0
-        black_adjustment = abs(self.compensation) if self.compensation < 0 else 0
-        white_points_on_board = 0
-        white_adjustment = self.compensation if self.compensation else 0
-        clean_groups, _ = PointSet.sets(clean)
-        for group in clean_groups:
-            points = len(group)
-            if (
-                group.color is Color.BLACK or
-                group.color is Color.EMPTY and
-                    group.reaches[Color.BLACK] and
-                    not group.reaches[Color.WHITE]
-            ):
-                black_points_on_board += points
-            elif (
-                group.color is Color.WHITE or
-                group.color is Color.EMPTY and
-                    group.reaches[Color.WHITE] and
-                    not group.reaches[Color.BLACK]
-            ):
-                white_points_on_board += points
-        final_outcome = calculate_outcome(
-            black_points_on_board,
-            black_adjustment,
-            white_points_on_board,
-            white_adjustment
-        )
+        clean.unmark()
+        final_outcome = get_scoring_engine(clean.span).score_cells(clean.cells, self.compensation)
         return Game(
             source=self,
             board=clean,
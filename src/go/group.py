@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+from .color import Color
+
+
+class Group:
+    # An immutable record of a chain of stones and its liberties.  Boards share these between copies and replace a
+    # record whenever a placement or capture changes it, so it mirrors the PointSet interface without flood-filling.
+    def __init__(self, color: Color, members: frozenset, liberties: frozenset):
+        self.color = color
+        self.members = members
+        self.liberties = liberties
+        self._reaches = None
+
+    @property
+    def reaches(self):
+        if self._reaches is None:
+            reaches = {x: False for x in Color}
+            reaches[Color.EMPTY] = len(self.liberties) > 0
+            for member in self.members:
+                for neighbor in member.neighbors:
+                    if neighbor not in self.members and neighbor not in self.liberties:
+                        reaches[self.color.inverse] = True
+                        break
+            self._reaches = reaches
+        return self._reaches
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __len__(self):
+        return len(self.members)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+# History maps Board.position hashes to the cons chain of entries recorded for them (a Game records the Board's check
+# hash and the player to move).  It is a hash array mapped trie: adding a position copies only the handful of nodes on
+# the path to its leaf, so every Game in a search tree shares everything it has in common with its parent and siblings
+# while lookups stay a few shifts and masks deep.
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+
+
+class _Node:
+    __slots__ = ('bitmap', 'entries')
+
+    def __init__(self, bitmap: int, entries: tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+def _find(node: _Node, key: int):
+    remaining = key
+    while True:
+        bit = 1 << (remaining & _MASK)
+        bitmap = node.bitmap
+        if not bitmap & bit:
+            return None
+        entry = node.entries[(bitmap & (bit - 1)).bit_count()]
+        if type(entry) is not _Node:
+            return entry if entry[0] == key else None
+        node = entry
+        remaining >>= _BITS
+
+
+def _insert(node: _Node, key: int, value, shift: int):
+    bit = 1 << ((key >> shift) & _MASK)
+    slot = (node.bitmap & (bit - 1)).bit_count()
+    entries = list(node.entries)
+    if not node.bitmap & bit:
+        entries.insert(slot, (key, value))
+        return _Node(node.bitmap | bit, tuple(entries))
+    entry = entries[slot]
+    if type(entry) is _Node:
+        entries[slot] = _insert(entry, key, value, shift + _BITS)
+    elif entry[0] == key:
+        entries[slot] = (key, value)
+    else:
+        child = _Node(1 << ((entry[0] >> (shift + _BITS)) & _MASK), (entry,))
+        entries[slot] = _insert(child, key, value, shift + _BITS)
+    return _Node(node.bitmap, tuple(entries))
+
+
+_EMPTY = _Node(0, ())
+
+
+class History:
+    def __init__(self, root: _Node = _EMPTY, size: int = 0):
+        self._root = root
+        self._size = size
+
+    def add(self, position: int, value):
+        entry = _find(self._root, position)
+        if entry is None:
+            return History(_insert(self._root, position, (value, None), 0), self._size + 1)
+        return History(_insert(self._root, position, (value, entry[1]), 0), self._size + 1)
+
+    def get(self, position: int, default=None):
+        entry = _find(self._root, position)
+        return default if entry is None else entry[1]
+
+    def __contains__(self, position: int):
+        return _find(self._root, position) is not None
+
+    def __getitem__(self, position: int):
+        entry = _find(self._root, position)
+        if entry is None:
+            raise KeyError(position)
+        return entry[1]
+
+    def __len__(self):
+        return self._size
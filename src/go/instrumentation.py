@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from .board import Board
+from .game import Game
+from .pointset import PointSet
+
+# Opt-in counters for the hot paths of self-play.  Nothing is instrumented until enable() replaces Board.__init__,
+# PointSet.__init__ and Game._remove_captures with counting wrappers, and disable() puts the originals back, so a process
+# that never enables it runs exactly the code it would without this module.  selfplay adds the wall time of each
+# Agent.select_move (by agent class) and the History size of each game.  counters holds the running totals of this
+# process; every game played through observe() also appends its own totals to games.  A profiler, once set, wraps each
+# observed game: CProfiler writes a cProfile dump per game and SamplingProfiler tallies where the playing thread is.
+
+counters = Counter()
+games = []
+
+_originals = {}
+_profiler = None
+
+
+def enabled():
+    return bool(_originals)
+
+
+def active():
+    return bool(_originals) or _profiler is not None
+
+
+def enable():
+    if _originals:
+        return
+    _originals[Board, '__init__'] = Board.__dict__['__init__']
+    _originals[PointSet, '__init__'] = PointSet.__dict__['__init__']
+    _originals[Game, '_remove_captures'] = Game.__dict__['_remove_captures']
+    board_init = Board.__init__
+    point_set_init = PointSet.__init__
+    remove_captures = Game._remove_captures
+
+    def counted_board_init(self, span: int = None, source=None):
+        board_init(self, span, source)
+        counters['board_copies' if source is not None else 'boards'] += 1
+
+    def counted_point_set_init(self, board, start):
+        point_set_init(self, board, start)
+        counters['point_sets'] += 1
+        counters['point_set_cells'] += len(self.members)
+
+    def counted_remove_captures(board, start, played_by):
+        counters['remove_captures'] += 1
+        return remove_captures(board, start, played_by)
+
+    Board.__init__ = counted_board_init
+    PointSet.__init__ = counted_point_set_init
+    Game._remove_captures = staticmethod(counted_remove_captures)
+
+
+def disable():
+    for (owner, name), original in _originals.items():
+        setattr(owner, name, original)
+    _originals.clear()
+
+
+def reset():
+    counters.clear()
+    games.clear()
+
+
+def snapshot():
+    return Counter(counters)
+
+
+def set_profiler(profiler=None):
+    # profiler is called with no arguments around each observed game and must return a context manager; None removes it.
+    global _profiler
+    _profiler = profiler
+
+
+def select_move(agent, game: Game):
+    if not _originals:
+        return agent.select_move(game)
+    start = time.perf_counter()
+    move = agent.select_move(game)
+    name = type(agent).__name__
+    counters[f'select_move_calls.{name}'] += 1
+    counters[f'select_move_seconds.{name}'] += time.perf_counter() - start
+    return move
+
+
+def observe(play, *arguments):
+    # Runs play(*arguments), which must return the finished Game, under the profiler and records that game's totals.
+    before = snapshot()
+    with _profiler() if _profiler is not None else nullcontext():
+        game = play(*arguments)
+    counters['games'] += 1
+    counters['history_positions'] += len(game.history)
+    totals = Counter(counters)
+    totals.subtract(before)
+    games.append(+totals)
+    return game
+
+
+class CProfiler:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.profiles = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def __call__(self):
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield profile
+        finally:
+            profile.disable()
+            self.profiles += 1
+            profile.dump_stats(os.path.join(self.directory, f'{os.getpid()}-{self.profiles:06}.prof'))
+
+
+class SamplingProfiler:
+    # Every interval seconds a daemon thread looks at the frame the profiled thread is executing and counts its
+    # (file, line, function), and each function on the stack once in inclusive; the Counters accumulate across games.
+    def __init__(self, interval: float = 0.001):
+        assert interval > 0
+        self.interval = interval
+        self.samples = Counter()
+        self.inclusive = Counter()
+
+    def _sample(self, thread: int, stopped: threading.Event):
+        while not stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread)
+            if frame is None:
+                continue
+            code = frame.f_code
+            self.samples[code.co_filename, frame.f_lineno, code.co_name] += 1
+            functions = set()
+            while frame is not None:
+                code = frame.f_code
+                functions.add((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self.inclusive.update(functions)
+
+    @contextmanager
+    def __call__(self):
+        stopped = threading.Event()
+        sampler = threading.Thread(target=self._sample, args=(threading.get_ident(), stopped), daemon=True)
+        sampler.start()
+        try:
+            yield self
+        finally:
+            stopped.set()
+            sampler.join()
+
+    def top(self, count: int = 20, inclusive: bool = False):
+        return (self.inclusive if inclusive else self.samples).most_common(count)
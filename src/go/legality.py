@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+from . import zobrist
+from .board import Board
+from .color import Color
+from .coordinate import Coordinate
+from .rules import Ko, RuleSet, Suicide, TRAINING
+
+# Game._prepare_reference decides whether each empty point is playable by copying the Board, placing a stone, removing
+# captures and flood-filling the new group.  Only a handful of points can actually be illegal, though, and this engine
+# looks at those alone:
+#
+#   - the ko point;
+#   - the enclosed points (Board.enclosed), since a point with an empty neighbor can never be suicide;
+#   - where the rules forbid recreating earlier positions, the points in repeatable: those a capture or suicide has
+#     emptied since the earliest such position.  A move can only recreate a position in which its point was occupied,
+#     and only a removal empties a point, so a move anywhere else makes a position never seen before.
+#
+# Game keeps the emptied points as it plays and Board keeps enclosed up to date around each write, so the work per move
+# follows what the last moves touched rather than the size of the board.  Each candidate is answered from the liberties
+# the Board already tracks, with the hash of the position the move would make worked out without playing it.
+# Repetition is then whatever the rules make cheapest: simple ko is the single ko point, send-two-return-one adds the
+# position from two moves back, and the superko rules look the hash up in the History.  A hash found there is taken as
+# a repetition, unless double_hash asks for the position's check hash to match as well; no Board is ever compared.
+
+
+def _removal_hash(group, table=zobrist.get_cell_hash):
+    removal = 0
+    for member in group.members:
+        removal ^= table(member, group.color) ^ table(member, Color.EMPTY)
+    return removal
+
+
+def _check_after(board: Board, coordinate: Coordinate, player: Color, removed, suicide: bool):
+    # The check hash of the position the move makes; a suicide's own stone is placed and removed again.
+    check = board.check
+    if not suicide:
+        check ^= zobrist.get_check_hash(coordinate, Color.EMPTY) ^ zobrist.get_check_hash(coordinate, player)
+    for group in removed:
+        check ^= _removal_hash(group, zobrist.get_check_hash)
+    return check
+
+
+def mark_unplayable(
+    board: Board,
+    player: Color,
+    history,
+    rules: RuleSet = TRAINING,
+    ko_point: Coordinate = None,
+    recent=(),
+    double_hash: bool = False,
+    repeatable: int = 0
+):
+    # board carries no UNPLAYABLE marks.  ko_point is the point simple ko forbids and recent the hashes of any other
+    # positions the rules forbid outright; history holds (check hash, player to move) entries for superko, and
+    # repeatable is the bitmask of points where a move could recreate any of those positions.
+    next_board = Board(source=board)
+    coordinates = board.coordinates
+    cells = board.cells
+    empty = Color.EMPTY.index
+    opponent = player.inverse
+    cell_hash = zobrist.get_cell_hash
+    superko = rules.ko is Ko.POSITIONAL or rules.ko is Ko.SITUATIONAL
+    situational = rules.ko is Ko.SITUATIONAL
+    suicide_allowed = rules.suicide is Suicide.YES
+    candidates = board.enclosed | repeatable
+    if ko_point is not None:
+        candidates |= 1 << ko_point.index
+    while candidates:
+        lowest = candidates & -candidates
+        candidates ^= lowest
+        index = lowest.bit_length() - 1
+        if cells[index] != empty:
+            continue
+        coordinate = coordinates[index]
+        position = board.position ^ cell_hash(coordinate, Color.EMPTY) ^ cell_hash(coordinate, player)
+        enclosed = True
+        escapes = False
+        captured = []
+        own = []
+        for neighbor in coordinate.neighbors:
+            group = board.group(neighbor)
+            if group is None:
+                enclosed = False
+            elif group.color is opponent:
+                if len(group.liberties) == 1 and group not in captured:
+                    captured.append(group)
+                    position ^= _removal_hash(group)
+            elif len(group.liberties) > 1:
+                escapes = True
+            elif group not in own:
+                own.append(group)
+        playable = captured or escapes or not enclosed
+        suicide = not playable and suicide_allowed
+        if suicide:
+            playable = True
+            position ^= cell_hash(coordinate, player) ^ cell_hash(coordinate, Color.EMPTY)
+            for group in own:
+                position ^= _removal_hash(group)
+        if playable:
+            if coordinate == ko_point or position in recent:
+                playable = False
+            elif superko and position in history:
+                check = None
+                if double_hash:
+                    check = _check_after(board, coordinate, player, own if suicide else captured, suicide)
+                cons = history[position]
+                while playable and cons:
+                    entry_check, to_play = cons[0]
+                    if not situational or to_play is opponent:
+                        playable = double_hash and entry_check != check
+                    cons = cons[1]
+        if not playable:
+            next_board[coordinate] = Color.UNPLAYABLE
+    return next_board
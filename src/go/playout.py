@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+import random
+from .color import Color
+from .game import Game
+from .scoring import get_scoring_engine
+
+# Monte Carlo playouts do not need Games: they never look back, never branch and only care about the final score.  A
+# PlayoutEngine loads a starting Game once and then replays from it as often as asked, reusing one set of flat buffers.
+# Groups are circular linked lists of stones (next_stone) with a representative (head) that holds the group's size and
+# pseudo-liberty count (one per adjacent empty point per stone), which is exact enough to detect captures and suicide.
+# Ko is enforced as simple ko; a move limit stops the rare playout that cycles.
+
+_EMPTY = Color.EMPTY.index
+_BLACK = Color.BLACK.index
+_WHITE = Color.WHITE.index
+
+
+class PlayoutEngine:
+    def __init__(self, span: int, avoid_eyes: bool = True, move_limit: int = None, rng: random.Random = None):
+        self.span = span
+        self.avoid_eyes = avoid_eyes
+        self.rng = rng if rng is not None else random.Random()
+        self.moves = 0
+        self._game = None
+        self._size = span * span
+        self.move_limit = move_limit if move_limit is not None else 3 * self._size
+
+        size = self._size
+        self.cells = bytearray(size)
+        self.head = [0] * size
+        self.next_stone = [0] * size
+        self.liberties = [0] * size
+        self.stones = [0] * size
+        self.empties = [0] * size
+        self.where = [0] * size
+        self.empty_count = 0
+        self.ko = -1
+
+        self._template = None
+
+    def load(self, game: Game):
+        assert game.board.span == self.span
+        coordinates = game.board.coordinates
+        self._neighbors = coordinates.neighbor_indices
+        self._corners = coordinates.corner_indices
+        self._game = game
+
+        size = self._size
+        cells = bytearray(size)
+        forbidden = set()
+        for index, color in enumerate(game.board.cells):
+            if color == Color.UNPLAYABLE.index:
+                forbidden.add(index)
+            elif color != _EMPTY:
+                cells[index] = color
+        self.cells[:] = cells
+        self.empty_count = 0
+        for index in range(size):
+            if cells[index] == _EMPTY:
+                self._add_empty(index)
+        seen = set()
+        for index in range(size):
+            if cells[index] != _EMPTY and index not in seen:
+                self._link_group(index, seen)
+        player = game.current_player.index if not game.over else _BLACK
+        passes = 2 if game.over else 1 if game.pass_ends_game else 0
+        self._template = (
+            bytes(self.cells), self.head[:], self.next_stone[:], self.liberties[:], self.stones[:],
+            self.empties[:], self.where[:], self.empty_count, player, passes, frozenset(forbidden)
+        )
+
+    def run(self, game: Game = None):
+        if game is not None and game is not self._game:
+            self.load(game)
+        assert self._template is not None
+        cells, head, next_stone, liberties, stones, empties, where, empty_count, player, passes, forbidden = \
+            self._template
+        self.cells[:] = cells
+        self.head[:] = head
+        self.next_stone[:] = next_stone
+        self.liberties[:] = liberties
+        self.stones[:] = stones
+        self.empties[:] = empties
+        self.where[:] = where
+        self.empty_count = empty_count
+        self.ko = -1
+        self.moves = 0
+
+        # Each move draws uniformly from the live front of empties.  A rejected candidate is swapped behind it, so the
+        # next draw is again uniform over the candidates not yet tried.
+        random = self.rng.random
+        avoid_eyes = self.avoid_eyes
+        move_limit = self.move_limit
+        neighbors = self._neighbors
+        cells = self.cells
+        empties = self.empties
+        where = self.where
+        moves = 0
+        while passes < 2 and moves < move_limit:
+            move = -1
+            live = self.empty_count
+            while live:
+                slot = int(random() * live)
+                candidate = empties[slot]
+                if candidate != self.ko and not (moves == 0 and candidate in forbidden):
+                    # A point with an empty neighbor is always legal and never an eye.
+                    for neighbor in neighbors[candidate]:
+                        if cells[neighbor] == _EMPTY:
+                            move = candidate
+                            break
+                    else:
+                        if not (avoid_eyes and self._is_eye(candidate, player)) and self._is_legal(candidate, player):
+                            move = candidate
+                    if move >= 0:
+                        break
+                live -= 1
+                other = empties[live]
+                empties[slot] = other
+                empties[live] = candidate
+                where[other] = slot
+                where[candidate] = live
+            if move < 0:
+                passes += 1
+                self.ko = -1
+            else:
+                passes = 0
+                self._place(move, player)
+            player = 3 - player
+            moves += 1
+        self.moves = moves
+        return self.score()
+
+    def run_many(self, game: Game, count: int):
+        self.load(game)
+        return [self.run() for _ in range(count)]
+
+    def score(self):
+        return get_scoring_engine(self.span).score_cells(self.cells, self._game.compensation)
+
+    def _link_group(self, start: int, seen: set):
+        cells = self.cells
+        color = cells[start]
+        members = [start]
+        seen.add(start)
+        for current in members:
+            for neighbor in self._neighbors[current]:
+                if cells[neighbor] == color and neighbor not in seen:
+                    seen.add(neighbor)
+                    members.append(neighbor)
+        pseudo_liberties = 0
+        for index, member in enumerate(members):
+            self.head[member] = start
+            self.next_stone[member] = members[(index + 1) % len(members)]
+            for neighbor in self._neighbors[member]:
+                if cells[neighbor] == _EMPTY:
+                    pseudo_liberties += 1
+        self.liberties[start] = pseudo_liberties
+        self.stones[start] = len(members)
+
+    def _add_empty(self, index: int):
+        self.where[index] = self.empty_count
+        self.empties[self.empty_count] = index
+        self.empty_count += 1
+
+    def _is_eye(self, index: int, player: int):
+        cells = self.cells
+        for neighbor in self._neighbors[index]:
+            if cells[neighbor] != player:
+                return False
+        corners = self._corners[index]
+        friendly = 0
+        for corner in corners:
+            if cells[corner] == player:
+                friendly += 1
+        return friendly >= 3 if len(corners) == 4 else friendly == len(corners)
+
+    def _is_legal(self, index: int, player: int):
+        # For a point with no empty neighbor: legal when it joins a group with another liberty or captures one.  Each
+        # stone of a group next to the point gives it one pseudo-liberty there, so a group with more pseudo-liberties
+        # than the point has neighbors certainly has a liberty elsewhere.
+        cells = self.cells
+        head = self.head
+        liberties = self.liberties
+        neighbors = self._neighbors[index]
+        for neighbor in neighbors:
+            group = head[neighbor]
+            count = liberties[group]
+            if count > len(neighbors):
+                if cells[neighbor] == player:
+                    return True
+                continue
+            adjacent = 0
+            for other in neighbors:
+                if head[other] == group:
+                    adjacent += 1
+            if count > adjacent if cells[neighbor] == player else count == adjacent:
+                return True
+        return False
+
+    def _place(self, index: int, player: int):
+        cells = self.cells
+        head = self.head
+        liberties = self.liberties
+        neighbors = self._neighbors[index]
+
+        self.empty_count -= 1
+        last = self.empties[self.empty_count]
+        slot = self.where[index]
+        self.empties[slot] = last
+        self.where[last] = slot
+        cells[index] = player
+        next_stone = self.next_stone
+        head[index] = index
+        next_stone[index] = index
+        self.stones[index] = 1
+        pseudo_liberties = 0
+        for neighbor in neighbors:
+            if cells[neighbor] == _EMPTY:
+                pseudo_liberties += 1
+        liberties[index] = pseudo_liberties
+
+        captured = 0
+        captured_at = -1
+        for neighbor in neighbors:
+            color = cells[neighbor]
+            if color == _EMPTY:
+                continue
+            group = head[neighbor]
+            liberties[group] -= 1
+            if color == player:
+                if head[index] == index:
+                    # The new stone joins its first friendly group: splice it into that group's ring.
+                    head[index] = group
+                    next_stone[index] = next_stone[group]
+                    next_stone[group] = index
+                    self.stones[group] += 1
+                    liberties[group] += liberties[index]
+                elif group != head[index]:
+                    self._merge(head[index], group)
+            elif liberties[group] == 0:
+                captured_at = group
+                captured += self._capture(group)
+
+        group = head[index]
+        if captured == 1 and self.stones[group] == 1 and liberties[group] == 1:
+            self.ko = captured_at
+        else:
+            self.ko = -1
+
+    def _merge(self, first: int, second: int):
+        head = self.head
+        next_stone = self.next_stone
+        if self.stones[first] < self.stones[second]:
+            first, second = second, first
+        stone = second
+        while True:
+            head[stone] = first
+            stone = next_stone[stone]
+            if stone == second:
+                break
+        next_stone[first], next_stone[second] = next_stone[second], next_stone[first]
+        self.stones[first] += self.stones[second]
+        self.liberties[first] += self.liberties[second]
+
+    def _capture(self, group: int):
+        cells = self.cells
+        head = self.head
+        next_stone = self.next_stone
+        liberties = self.liberties
+        count = 0
+        stone = group
+        while True:
+            cells[stone] = _EMPTY
+            self._add_empty(stone)
+            count += 1
+            stone = next_stone[stone]
+            if stone == group:
+                break
+        stone = group
+        while True:
+            for neighbor in self._neighbors[stone]:
+                if cells[neighbor] != _EMPTY:
+                    liberties[head[neighbor]] += 1
+            stone = next_stone[stone]
+            if stone == group:
+                break
+        return count
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from collections import deque
+from .bitboard import indices
 from .board import Board
 from .color import Color
 from .coordinate import Coordinate
@@ -20,21 +20,15 @@ class PointSet:
         return sets, coordinate_to_point_set
 
     def __init__(self, board: Board, start: Coordinate):
+        bitboard = board.bitboard
+        coordinates = board.coordinates
         self.color = board[start].simple
-        self.members = {start}
+        region = bitboard.region(start.index)
+        self.members = {coordinates[index] for index in indices(region)}
         self.reaches = {x: False for x in Color}
-        to_visit = deque([start])
-        queued = {start}
-        while to_visit:
-            current = to_visit.popleft()
-            color = board[current].simple
-            if color is self.color:
-                self.members.add(current)
-                for neighbor in current.neighbors:
-                    if neighbor not in queued:
-                        to_visit.append(neighbor)
-                        queued.add(neighbor)
-            else:
+        border = bitboard.masks.neighbors(region) & ~region
+        for color in (Color.EMPTY, Color.BLACK, Color.WHITE):
+            if color is not self.color and border & bitboard.mask(color):
                 self.reaches[color] = True
 
     def __iter__(self):
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+
+from . import zobrist
+from .color import Color, COLORS
+from .coordinate import get_coordinates, Coordinate, PASS
+from .rules import Ko, Suicide
+
+# A Position is the search-tree counterpart of a Game.  It keeps only the stones (as bytes of Color.index values), the
+# position and check hashes, the player to move, the ko point, the number of consecutive passes and a pointer to its
+# parent; moves are coordinate indices, with PASS_MOVE for a pass.  Legal moves are derived as a bitmap the first time
+# they are asked for, under the root Game's RuleSet exactly as a Game applies it (the rule checks are shared with
+# SearchPosition).  Superko looks at the root Game's History and at the positions of the Position's ancestors, which
+# are recorded over it in a small overlay rather than in a History of each Position's own.
+
+PASS_MOVE = -1
+
+_EMPTY = Color.EMPTY.index
+_UNMARK = bytes.maketrans(bytes([Color.UNPLAYABLE.index]), bytes([Color.EMPTY.index]))
+_SPANS = {}
+_TABLES = {}
+
+
+def _coordinates_for(cells):
+    size = len(cells)
+    if size not in _SPANS:
+        span = int(round(size ** 0.5))
+        _SPANS[size] = get_coordinates(span)
+    return _SPANS[size]
+
+
+def _tables_for(cells):
+    # (neighbor indices, cell hashes, check hashes) for the span of cells.
+    size = len(cells)
+    if size not in _TABLES:
+        coordinates = _coordinates_for(cells)
+        span = coordinates.span
+        _TABLES[size] = (coordinates.neighbor_indices, zobrist.get_cell_hashes(span), zobrist.get_check_hashes(span))
+    return _TABLES[size]
+
+
+def encode_move(move: Coordinate):
+    return PASS_MOVE if move == PASS else move.index
+
+
+def _chain(cells, start: int, neighbors):
+    color = cells[start]
+    stones = [start]
+    seen = {start}
+    liberties = set()
+    for stone in stones:
+        for neighbor in neighbors[stone]:
+            neighbor_color = cells[neighbor]
+            if neighbor_color == _EMPTY:
+                liberties.add(neighbor)
+            elif neighbor_color == color and neighbor not in seen:
+                seen.add(neighbor)
+                stones.append(neighbor)
+    return stones, liberties
+
+
+def _label_chains(cells, neighbors):
+    chains = [None] * len(cells)
+    for index, color in enumerate(cells):
+        if color != _EMPTY and chains[index] is None:
+            stones, liberties = _chain(cells, index, neighbors)
+            chain = (color, liberties, stones)
+            for stone in stones:
+                chains[stone] = chain
+    return chains
+
+
+class _Recorded:
+    # A History with the positions of a line of Positions recorded over it.
+    __slots__ = ('recorded', 'history')
+
+    def __init__(self, recorded: dict, history):
+        self.recorded = recorded
+        self.history = history
+
+    def get(self, position: int, default=None):
+        cons = self.recorded.get(position)
+        return cons if cons is not None else self.history.get(position, default)
+
+    def add(self, position: int, entry):
+        recorded = dict(self.recorded)
+        recorded[position] = (entry, self.get(position))
+        return _Recorded(recorded, self.history)
+
+
+class _RuleChecks:
+    # The legality of a board move under a RuleSet, as mark_unplayable decides it, and its effect on the stones.  A
+    # subclass provides cells, player, position, check, ko, rules, double_hash, over and the _neighbors, _hashes and
+    # _checks tables of its span.
+    __slots__ = ()
+
+    def _chain_of(self, index: int, chains: dict):
+        chain = chains.get(index)
+        if chain is None:
+            stones, liberties = _chain(self.cells, index, self._neighbors)
+            chain = (self.cells[index], liberties, stones)
+            for stone in stones:
+                chains[stone] = chain
+        return chain
+
+    def _consider(self, move: int, chains: dict, recent, history):
+        # (position hash, removed chains, whether it is a suicide) of a legal board move, or None when the rules forbid
+        # it; recent holds the hashes of the positions the rules forbid outright (see Game._recent) and history.get maps
+        # hashes to cons chains of (check hash, player to move) entries as History.get does.
+        cells = self.cells
+        if self.over or cells[move] != _EMPTY or move == self.ko:
+            return None
+        player = self.player
+        opponent = 3 - player
+        hashes = self._hashes
+        position = self.position ^ hashes[move][_EMPTY] ^ hashes[move][player]
+        enclosed = True
+        escapes = False
+        captured = []
+        own = []
+        for neighbor in self._neighbors[move]:
+            if cells[neighbor] == _EMPTY:
+                enclosed = False
+                continue
+            chain = self._chain_of(neighbor, chains)
+            if chain[0] == opponent:
+                if len(chain[1]) == 1 and not any(other is chain for other in captured):
+                    captured.append(chain)
+                    for stone in chain[2]:
+                        position ^= hashes[stone][opponent] ^ hashes[stone][_EMPTY]
+            elif len(chain[1]) > 1:
+                escapes = True
+            elif not any(other is chain for other in own):
+                own.append(chain)
+        removed = captured
+        suicide = not (captured or escapes or not enclosed)
+        if suicide:
+            if self.rules.suicide is not Suicide.YES:
+                return None
+            removed = own
+            position ^= hashes[move][player] ^ hashes[move][_EMPTY]
+            for chain in own:
+                for stone in chain[2]:
+                    position ^= hashes[stone][player] ^ hashes[stone][_EMPTY]
+        if position in recent:
+            return None
+        ko = self.rules.ko
+        cons = history.get(position) if ko is Ko.POSITIONAL or ko is Ko.SITUATIONAL else None
+        if cons:
+            check = self._check_after(move, removed, suicide) if self.double_hash else None
+            to_move = COLORS[opponent]
+            while cons:
+                entry_check, to_play = cons[0]
+                if (ko is not Ko.SITUATIONAL or to_play is to_move) and not (self.double_hash and entry_check != check):
+                    return None
+                cons = cons[1]
+        return position, removed, suicide
+
+    def _recent_rules(self, earlier):
+        # As Game._recent, with earlier(steps) giving the hash of the position that many moves back (or None).
+        rules = self.rules
+        recent = ()
+        if rules.ko is Ko.SEND_TWO_RETURN_ONE:
+            position = earlier(2)
+            if position is not None:
+                recent += (position,)
+        if rules.suicide is Suicide.YES and rules.ko in (Ko.SIMPLE, Ko.SEND_TWO_RETURN_ONE):
+            position = earlier(1)
+            if position is not None:
+                recent += (position,)
+        return recent
+
+    def _check_after(self, move: int, removed, suicide: bool):
+        checks = self._checks
+        player = self.player
+        check = self.check
+        if not suicide:
+            check ^= checks[move][_EMPTY] ^ checks[move][player]
+        for color, _, stones in removed:
+            for stone in stones:
+                check ^= checks[stone][color] ^ checks[stone][_EMPTY]
+        return check
+
+    def _apply(self, cells, move: int, removed, suicide: bool):
+        # Plays a move _consider allowed on cells (these cells or a copy of them) and returns the new check hash, the
+        # stones it removed, their color and the new ko point.
+        player = self.player
+        checks = self._checks
+        check = self.check ^ checks[move][_EMPTY] ^ checks[move][player]
+        cells[move] = player
+        stones = [stone for _, _, chain in removed for stone in chain]
+        color = removed[0][0] if removed else _EMPTY
+        if suicide:
+            color = player
+            stones.append(move)
+        for stone in stones:
+            cells[stone] = _EMPTY
+            check ^= checks[stone][color] ^ checks[stone][_EMPTY]
+        ko = -1
+        if color != player and len(stones) == 1:
+            chain, liberties = _chain(cells, move, self._neighbors)
+            if len(chain) == 1 and len(liberties) == 1:
+                ko = stones[0]
+        return check, stones, color, ko
+
+
+class Position(_RuleChecks):
+    __slots__ = (
+        'parent', 'move', 'cells', 'position', 'check', 'player', 'passes', 'ko', 'rules', 'double_hash', 'game',
+        '_legal', '_recorded', '_neighbors', '_hashes', '_checks'
+    )
+
+    def __init__(
+        self,
+        parent,
+        move: int,
+        cells: bytes,
+        position: int,
+        check: int,
+        player: int,
+        passes: int,
+        ko: int,
+        rules,
+        double_hash: bool,
+        game=None
+    ):
+        self.parent = parent
+        self.move = move
+        self.cells = cells
+        self.position = position
+        self.check = check
+        self.player = player
+        self.passes = passes
+        self.ko = ko
+        self.rules = rules
+        self.double_hash = double_hash
+        self.game = game
+        self._legal = None
+        self._recorded = None
+        if parent is None:
+            self._neighbors, self._hashes, self._checks = _tables_for(cells)
+        else:
+            self._neighbors, self._hashes, self._checks = parent._neighbors, parent._hashes, parent._checks
+
+    @staticmethod
+    def from_game(game):
+        board = game.board
+        player = game.current_player.index if not game.over else _EMPTY
+        passes = 2 if game.over else 1 if game.previous_move is PASS else 0
+        ko = game.ko_point.index if game.ko_point is not None else -1
+        return Position(
+            None,
+            None,
+            bytes(board.cells).translate(_UNMARK),
+            board.position,
+            board.check,
+            player,
+            passes,
+            ko,
+            game.rules,
+            game.double_hash,
+            game
+        )
+
+    def to_game(self):
+        moves = []
+        node = self
+        while node.parent is not None:
+            moves.append(node.move)
+            node = node.parent
+        game = node.game
+        coordinates = game.board.coordinates
+        for move in reversed(moves):
+            game = game.play(PASS if move == PASS_MOVE else coordinates[move])
+        return game
+
+    @property
+    def over(self):
+        return self.passes >= 2
+
+    @property
+    def key(self):
+        if self.over:
+            return self.position ^ zobrist.GAME_OVER ^ zobrist.PREVIOUS_MOVE_SECOND_PASS
+        to_play = zobrist.BLACK_TO_PLAY if self.player == Color.BLACK.index else zobrist.WHITE_TO_PLAY
+        previous_move = zobrist.PREVIOUS_MOVE_FIRST_PASS if self.passes else zobrist.PREVIOUS_MOVE_PLAY
+        return self.position ^ to_play ^ previous_move
+
+    @property
+    def legal(self):
+        if self._legal is None:
+            self._legal = self._derive_legal()
+        return self._legal
+
+    def legal_moves(self):
+        if self.over:
+            return
+        legal = self.legal
+        index = 0
+        while legal:
+            if legal & 1:
+                yield index
+            legal >>= 1
+            index += 1
+        yield PASS_MOVE
+
+    def atari_liberties(self):
+        captures = set()
+        escapes = set()
+        if self.over:
+            return captures, escapes
+        chains = _label_chains(self.cells, self._neighbors)
+        for color, liberties, _ in {id(chain): chain for chain in chains if chain is not None}.values():
+            if len(liberties) == 1:
+                (liberty,) = liberties
+                if color == self.player:
+                    escapes.add(liberty)
+                else:
+                    captures.add(liberty)
+        legal = self.legal
+        return {move for move in captures if legal >> move & 1}, {move for move in escapes if legal >> move & 1}
+
+    def _history(self):
+        # The root Game's History with this Position's and its ancestors' positions recorded over it as Game._record
+        # would have, for superko; the other rules never consult it.  Each Position keeps its own, made from its
+        # parent's with one more position, so deriving legality never walks the whole line back to the root.
+        situational = self.rules.ko is Ko.SITUATIONAL
+        if not situational and self.rules.ko is not Ko.POSITIONAL:
+            return {}
+        unrecorded = []
+        node = self
+        while node._recorded is None and node.parent is not None:
+            unrecorded.append(node)
+            node = node.parent
+        if node._recorded is None:
+            node._recorded = _Recorded({}, node.game.history)
+        recorded = node._recorded
+        for node in reversed(unrecorded):
+            if node.move != PASS_MOVE or situational:
+                recorded = recorded.add(node.position, (node.check, COLORS[node.player]))
+            node._recorded = recorded
+        return recorded
+
+    def _earlier(self, steps: int):
+        node = self
+        while steps and node.parent is not None:
+            node = node.parent
+            steps -= 1
+        if not steps:
+            return node.position
+        state = node.game
+        while steps and state is not None:
+            state = state.previous_state
+            steps -= 1
+        return None if state is None else state.board.position
+
+    def play(self, move: int):
+        if self.over:
+            raise Exception("This Position is over; no further moves may be made (including passes).")
+        player = self.player
+        rules = self.rules
+        if move == PASS_MOVE:
+            return Position(
+                self, move, self.cells, self.position, self.check, 3 - player, self.passes + 1, -1, rules,
+                self.double_hash
+            )
+        if not self.legal >> move & 1:
+            raise Exception(f"{move} is not playable.")
+        # The legal bitmap has already ruled out repetitions, so only the move's effect on the stones is worked out.
+        position, removed, suicide = self._consider(move, {}, (), {})
+        cells = bytearray(self.cells)
+        check, _, _, ko = self._apply(cells, move, removed, suicide)
+        return Position(self, move, bytes(cells), position, check, 3 - player, 0, ko, rules, self.double_hash)
+
+    def _derive_legal(self):
+        if self.over:
+            return 0
+        chains = {}
+        recent = self._recent_rules(self._earlier)
+        history = self._history()
+        legal = 0
+        for index, color in enumerate(self.cells):
+            if color == _EMPTY and self._consider(index, chains, recent, history) is not None:
+                legal |= 1 << index
+        return legal
@@ -140,7 +140,7 @@ CHINESE = RuleSet(
     Ko.SEND_TWO_RETURN_ONE,
     PassStone.NO,
     SekiScoring.YES,
-    Suicide.FORBIDDEN,
+    Suicide.NO,
     WhiteHandicapBonus.N
 )
 
@@ -152,7 +152,7 @@ JAPANESE = RuleSet(
     Ko.SIMPLE,
     PassStone.NO,
     SekiScoring.NO,
-    Suicide.FORBIDDEN,
+    Suicide.NO,
     WhiteHandicapBonus.NONE
 )
 
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+from typing import Iterable, Sequence
+from .color import Color
+from .constants import MAX_SPAN
+from .outcome import calculate_outcome
+
+# Area scoring on bitboards.  A board becomes three Python ints (black, white and empty points, UNPLAYABLE counting as
+# empty) with each row followed by a guard bit and each board by a guard row, so that shifting by one or by a row width
+# moves every point onto its neighbors without wrapping into another row or board.  An empty region reaches a color
+# exactly when flood filling the empty points from the neighbors of that color's stones covers it, so both reaches
+# classifications take one fill each, and many boards laid end to end in one int are filled together.
+
+_EMPTY = Color.EMPTY.index
+_BLACK = Color.BLACK.index
+_WHITE = Color.WHITE.index
+_UNPLAYABLE = Color.UNPLAYABLE.index
+_GUARD = 0xFF
+
+
+def _table(*ones):
+    return bytes(ord('1') if value in ones else ord('0') for value in range(256))
+
+
+_BLACK_BITS = _table(_BLACK)
+_WHITE_BITS = _table(_WHITE)
+_EMPTY_BITS = _table(_EMPTY, _UNPLAYABLE)
+
+
+class ScoringEngine:
+    def __init__(self, span: int):
+        assert 1 <= span <= MAX_SPAN
+        self.span = span
+        self.width = span + 1
+        self.stride = self.width * (span + 1)
+        self._guard_row = bytes([_GUARD]) * self.width
+        self._guard = bytes([_GUARD])
+
+    def _layout(self, cells: bytes):
+        span = self.span
+        guard = self._guard
+        rows = [cells[start:start + span] + guard for start in range(0, span * span, span)]
+        rows.append(self._guard_row)
+        return b''.join(rows)
+
+    def _pack(self, boards: Sequence[bytes]):
+        # Bit n of each mask is byte n of the concatenated layouts, so the layouts are reversed before reading them as
+        # binary numbers.
+        layout = b''.join(self._layout(cells) for cells in boards)[::-1]
+        return (
+            int(layout.translate(_BLACK_BITS), 2),
+            int(layout.translate(_WHITE_BITS), 2),
+            int(layout.translate(_EMPTY_BITS), 2)
+        )
+
+    def _dilate(self, mask: int):
+        width = self.width
+        return mask << 1 | mask >> 1 | mask << width | mask >> width
+
+    def _fill(self, seeds: int, within: int):
+        filled = seeds & within
+        while True:
+            grown = (self._dilate(filled) & within) | filled
+            if grown == filled:
+                return filled
+            filled = grown
+
+    def _territories(self, black: int, white: int, empty: int):
+        reaches_black = self._fill(self._dilate(black), empty)
+        reaches_white = self._fill(self._dilate(white), empty)
+        return reaches_black & ~reaches_white, reaches_white & ~reaches_black
+
+    def reaches(self, cells: bytes):
+        # The indices of the empty points whose regions reach Black and White, as PointSet.reaches would say.
+        black, white, empty = self._pack([bytes(cells)])
+        return (
+            self._indices(self._fill(self._dilate(black), empty)),
+            self._indices(self._fill(self._dilate(white), empty))
+        )
+
+    def _indices(self, mask: int):
+        indices = set()
+        width = self.width
+        span = self.span
+        while mask:
+            low = mask & -mask
+            position = low.bit_length() - 1
+            indices.add(position // width * span + position % width)
+            mask ^= low
+        return frozenset(indices)
+
+    def points_on_board(self, boards: Iterable[bytes]):
+        # (black points, white points) for each board: stones plus the empty regions that reach only that color.
+        boards = [bytes(cells) for cells in boards]
+        if not boards:
+            return []
+        black, white, empty = self._pack(boards)
+        black_territory, white_territory = self._territories(black, white, empty)
+        black |= black_territory
+        white |= white_territory
+        stride = self.stride
+        board_mask = (1 << stride) - 1
+        return [
+            ((black >> shift & board_mask).bit_count(), (white >> shift & board_mask).bit_count())
+            for shift in range(0, stride * len(boards), stride)
+        ]
+
+    def score_cells(self, cells: bytes, compensation: float):
+        ((black, white),) = self.points_on_board([cells])
+        return _outcome(black, white, compensation)
+
+    def score_many(self, boards: Iterable[bytes], compensations: Iterable[float]):
+        return [
+            _outcome(black, white, compensation)
+            for (black, white), compensation in zip(self.points_on_board(boards), compensations)
+        ]
+
+
+def _outcome(black: int, white: int, compensation: float):
+    return calculate_outcome(
+        black,
+        abs(compensation) if compensation < 0 else 0,
+        white,
+        compensation if compensation else 0
+    )
+
+
+_ENGINES = {}
+
+
+def get_scoring_engine(span: int):
+    if span not in _ENGINES:
+        _ENGINES[span] = ScoringEngine(span)
+    return _ENGINES[span]
+
+
+def score_games(games):
+    # The Outcome Game.score() would give each finished, unscored Game with no dead groups, scoring boards of the same
+    # size together.
+    outcomes = [None] * len(games)
+    by_span = {}
+    for number, game in enumerate(games):
+        by_span.setdefault(game.board.span, []).append(number)
+    for span, numbers in by_span.items():
+        engine = get_scoring_engine(span)
+        scored = engine.score_many(
+            (games[number].board.cells for number in numbers),
+            (games[number].compensation for number in numbers)
+        )
+        for number, outcome in zip(numbers, scored):
+            outcomes[number] = outcome
+    return outcomes
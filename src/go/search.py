@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+from . import zobrist
+from .color import Color, COLORS
+from .coordinate import PASS
+from .game import Game
+from .position import PASS_MOVE, _RuleChecks
+from .rules import Ko, Suicide
+
+# A SearchPosition is one mutable position that a search walks with make_move() and unmake_move() instead of building
+# a Game per node.  It keeps the stones as a bytearray of Color.index values and works chains and liberties out from the
+# cells around a move when it needs them, so a move touches only its neighborhood.  Each make_move pushes what undoing
+# it takes: the move, the stones it removed and their color, the Zobrist and check hash deltas, and the ko point, pass
+# count and History it replaced.  Legality follows the Game's RuleSet exactly as mark_unplayable does (the ko point,
+# the recent positions and the History, which is persistent, so undoing a move just restores the previous one); the
+# checks themselves are shared with Position.
+
+_EMPTY = Color.EMPTY.index
+_UNMARK = bytes.maketrans(bytes([Color.UNPLAYABLE.index]), bytes([Color.EMPTY.index]))
+
+
+class SearchPosition(_RuleChecks):
+    def __init__(self, game: Game):
+        board = game.board
+        self.game = game
+        self.rules = game.rules
+        self.double_hash = game.double_hash
+        self.cells = bytearray(board.cells.translate(_UNMARK))
+        self.position = board.position
+        self.check = board.check
+        self.player = game.current_player.index if not game.over else _EMPTY
+        self.passes = 2 if game.over else 1 if game.previous_move is PASS else 0
+        self.ko = game.ko_point.index if game.ko_point is not None else -1
+        self.history = game.history
+        self.captures = [0, game.captures_by_black, game.captures_by_white]
+        # A stack of position hashes running parallel to _undo: the root's and up to two before it (as many as the rules
+        # can forbid), then one more for each move made, so that _earlier can look back from any depth.
+        self.positions = []
+        state = game
+        while state is not None and len(self.positions) < 3:
+            self.positions.append(state.board.position)
+            state = state.previous_state
+        self.positions.reverse()
+        self._undo = []
+        self._neighbors = board.coordinates.neighbor_indices
+        self._hashes = zobrist.get_cell_hashes(board.span)
+        self._checks = zobrist.get_check_hashes(board.span)
+
+    @property
+    def over(self):
+        return self.passes >= 2
+
+    @property
+    def depth(self):
+        return len(self._undo)
+
+    @property
+    def key(self):
+        if self.over:
+            return self.position ^ zobrist.GAME_OVER ^ zobrist.PREVIOUS_MOVE_SECOND_PASS
+        to_play = zobrist.BLACK_TO_PLAY if self.player == Color.BLACK.index else zobrist.WHITE_TO_PLAY
+        previous_move = zobrist.PREVIOUS_MOVE_FIRST_PASS if self.passes else zobrist.PREVIOUS_MOVE_PLAY
+        return self.position ^ to_play ^ previous_move
+
+    def _earlier(self, steps: int):
+        return self.positions[-1 - steps] if steps < len(self.positions) else None
+
+    def is_legal(self, move: int):
+        if move == PASS_MOVE:
+            return not self.over
+        return self._consider(move, {}, self._recent_rules(self._earlier), self.history) is not None
+
+    def legal_moves(self):
+        # Every legal move, board points by index and then PASS_MOVE; chains are worked out once for all of them.
+        if self.over:
+            return []
+        chains = {}
+        recent = self._recent_rules(self._earlier)
+        moves = [
+            move for move, color in enumerate(self.cells)
+            if color == _EMPTY and self._consider(move, chains, recent, self.history) is not None
+        ]
+        moves.append(PASS_MOVE)
+        return moves
+
+    def make_move(self, move: int):
+        if self.over:
+            raise Exception("This SearchPosition is over; no further moves may be made (including passes).")
+        player = self.player
+        history = self.history
+        if move == PASS_MOVE:
+            self._undo.append((move, (), _EMPTY, 0, 0, self.ko, self.passes, history))
+            if self.rules.ko is Ko.SITUATIONAL:
+                self.history = history.add(self.position, (self.check, COLORS[3 - player]))
+            self.passes += 1
+            self.ko = -1
+            self.player = 3 - player
+            self.positions.append(self.position)
+            return
+        considered = self._consider(move, {}, self._recent_rules(self._earlier), self.history)
+        if considered is None:
+            raise Exception(f"{move} is not playable.")
+        position, removed, suicide = considered
+        check, stones, color, ko = self._apply(self.cells, move, removed, suicide)
+        self._undo.append((
+            move, tuple(stones), color, position ^ self.position, check ^ self.check, self.ko, self.passes, history
+        ))
+        if color == player:
+            self.captures[3 - player] += len(stones)
+        elif stones:
+            self.captures[player] += len(stones)
+        self.position = position
+        self.check = check
+        self.history = history.add(position, (check, COLORS[3 - player]))
+        self.ko = ko
+        self.passes = 0
+        self.player = 3 - player
+        self.positions.append(position)
+
+    def unmake_move(self):
+        move, stones, color, position_delta, check_delta, ko, passes, history = self._undo.pop()
+        self.positions.pop()
+        self.player = 3 - self.player
+        self.ko = ko
+        self.passes = passes
+        self.history = history
+        if move == PASS_MOVE:
+            return move
+        self.position ^= position_delta
+        self.check ^= check_delta
+        cells = self.cells
+        for stone in stones:
+            cells[stone] = color
+        cells[move] = _EMPTY
+        if color == self.player:
+            self.captures[3 - self.player] -= len(stones)
+        elif stones:
+            self.captures[self.player] -= len(stones)
+        return move
+
+    def moves(self):
+        return [entry[0] for entry in self._undo]
+
+    def to_game(self):
+        game = self.game
+        coordinates = game.board.coordinates
+        for move in self.moves():
+            game = game.play(PASS if move == PASS_MOVE else coordinates[move])
+        return game
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, TextIO
+from . import constants, rules
+from .color import Color
+from .coordinate import PASS, Coordinate, get_coordinates
+from .game import Game
+from .outcome import Draw, Invalidated
+
+# Smart Game Format (FF[4]) reading and writing.  Only a game tree's main line is read (the first variation at every
+# branch), and only the properties a Game can represent: SZ, KM, HA, AB, RU and the B/W moves.  Row 1 is the top row, as
+# in SGF.  RU selects the matching preset RuleSet (TRAINING when it is missing or names any other rules), and is written
+# for every preset but TRAINING.  A read Game is replayed through Game.play, so anything its rules forbid raises; it
+# ends unscored because SGF does not say which stones were dead.
+#
+# read_collection() splits a stream of concatenated game trees into their texts chunk by chunk, so a collection is never
+# held in memory whole, and read_games() turns those texts into Games, optionally on a process pool.  The pool's workers
+# parse each game and replay it through Game.play, which is where the time goes, but send back only its plain values (as
+# lazysmp does, since a Game drags its whole history along when pickled).  The reading process then rebuilds the Game
+# from those without checking the moves again, which takes a fraction of the time.
+
+_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+_TOKEN = re.compile(r'\s*(?:([();])|([A-Za-z]+)\s*((?:\[(?:[^\]\\]|\\.)*\]\s*)+))', re.S)
+_VALUE = re.compile(r'\[((?:[^\]\\]|\\.)*)\]', re.S)
+_SPECIAL = re.compile(r'[()\[\]\\]')
+_ESCAPE = re.compile(r'\\(\r\n|\n\r|.)', re.S)
+_PASS_CODE = -1
+# (name in rules, RU value written) for each preset an SGF file can name.
+_RULE_SETS = (('AGA', 'AGA'), ('CHINESE', 'Chinese'), ('JAPANESE', 'Japanese'), ('TROMP_TAYLOR', 'Tromp-Taylor'))
+
+
+def _escape(text: str):
+    return text.replace('\\', '\\\\').replace(']', '\\]')
+
+
+def _unescape(text: str):
+    return _ESCAPE.sub(lambda match: '' if match.group(1) in ('\n', '\r\n', '\n\r') else match.group(1), text)
+
+
+def _point(coordinate: Coordinate):
+    return '' if coordinate == PASS else _LETTERS[coordinate.column - 1] + _LETTERS[coordinate.row - 1]
+
+
+def _simplify(name: str):
+    return ''.join(character for character in name.lower() if character.isalnum())
+
+
+def _rules_name(value: str):
+    for name, written in _RULE_SETS:
+        if _simplify(value) == _simplify(written):
+            return name
+    return 'TRAINING'
+
+
+def _rules_value(rule_set: rules.RuleSet):
+    for name, written in _RULE_SETS:
+        if vars(getattr(rules, name)) == vars(rule_set):
+            return written
+    return None
+
+
+def _result(game: Game):
+    outcome = game.outcome
+    if isinstance(outcome, Draw):
+        return '0'
+    elif outcome is Invalidated.INSTANCE:
+        return 'Void'
+    elif outcome.winner is not None:
+        return f'{"B" if outcome.winner is Color.BLACK else "W"}+{outcome.margin:g}'
+    return None
+
+
+def write_sgf(game: Game):
+    moves = []
+    state = game
+    while state.previous_state is not None:
+        if state.moves_played != state.previous_state.moves_played:
+            moves.append((state.previous_state.current_player, state.previous_move))
+        state = state.previous_state
+    moves.reverse()
+
+    properties = f'GM[1]FF[4]CA[UTF-8]SZ[{state.board.span}]KM[{state.compensation:g}]'
+    rules_value = _rules_value(state.rules)
+    if rules_value:
+        properties += f'RU[{rules_value}]'
+    if state.handicap_stones:
+        properties += f'HA[{state.handicap}]AB' + ''.join(
+            f'[{_point(stone)}]' for stone in sorted(state.handicap_stones, key=lambda stone: stone.index)
+        )
+    result = _result(game)
+    if result:
+        properties += f'RE[{_escape(result)}]'
+    nodes = ''.join(f';{"B" if player is Color.BLACK else "W"}[{_point(move)}]' for player, move in moves)
+    return f'(;{properties}{nodes})\n'
+
+
+def parse_sgf(text: str):
+    # Returns the main line of the first game tree as a list of nodes, each a dict from property to list of values.
+    nodes = []
+    position = 0
+    started = False
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            if text[position:].strip():
+                raise Exception(f'Malformed SGF at offset {position}.')
+            break
+        position = match.end()
+        punctuation, identifier, values = match.groups()
+        if punctuation == '(':
+            started = True
+        elif punctuation == ')':
+            break
+        elif punctuation == ';':
+            if not started:
+                raise Exception('SGF node outside a game tree.')
+            nodes.append({})
+        else:
+            if not nodes:
+                raise Exception(f'SGF property {identifier} outside a node.')
+            identifier = ''.join(character for character in identifier if character.isupper())
+            nodes[-1].setdefault(identifier, []).extend(_unescape(value) for value in _VALUE.findall(values))
+    if not nodes:
+        raise Exception('SGF contains no game tree.')
+    return nodes
+
+
+def _is_pass(value: str, span: int):
+    return value == '' or value == 'tt' and span <= 19
+
+
+def _coordinate(value: str, span: int):
+    if _is_pass(value, span):
+        return PASS
+    if len(value) != 2 or value[0] not in _LETTERS[:span] or value[1] not in _LETTERS[:span]:
+        raise Exception(f'{value} is not a point on a {span}x{span} board.')
+    return get_coordinates(span).get(_LETTERS.index(value[1]) + 1, _LETTERS.index(value[0]) + 1)
+
+
+def _parse_game(text: str):
+    # The main line of the first game tree as plain values: the name of its RuleSet in rules, the span, the
+    # compensation, the handicap stones' indices and the moves as ('B' or 'W', index) pairs, with _PASS_CODE for a pass.
+    nodes = parse_sgf(text)
+    root = nodes[0]
+    span = int(root.get('SZ', ['19'])[0].split(':')[0])
+    if not 1 <= span <= constants.MAX_SPAN:
+        raise Exception(f'Board size {span} is not supported.')
+    compensation = float(root.get('KM', ['0'])[0] or 0)
+    if 'AW' in root or 'AE' in root:
+        raise Exception('Only Black handicap stones (AB) are supported as setup.')
+    handicap_stones = []
+    for value in root.get('AB', []):
+        if _is_pass(value, span):
+            raise Exception(f'Malformed setup point AB[{value}].')
+        handicap_stones.append(_coordinate(value, span).index)
+    moves = []
+    for node in nodes:
+        for identifier in ('B', 'W'):
+            for value in node.get(identifier, []):
+                move = _coordinate(value, span)
+                moves.append((identifier, _PASS_CODE if move == PASS else move.index))
+    return _rules_name(root.get('RU', [''])[0]), span, compensation, handicap_stones, moves
+
+
+def _replay(rules_name: str, span: int, compensation: float, handicap_stones, moves, validate: bool = True):
+    # Without validate the moves must already have been replayed once, as _checked does.
+    coordinates = get_coordinates(span)
+    game = Game(
+        rules=getattr(rules, rules_name),
+        span=span,
+        compensation=compensation,
+        handicap_placement=[coordinates[index] for index in handicap_stones] or None
+    )
+    for identifier, move in moves:
+        if game.over:
+            raise Exception('SGF continues after the game ended.')
+        if (Color.BLACK if identifier == 'B' else Color.WHITE) is not game.current_player:
+            raise Exception(f'SGF has {identifier} to play out of turn at move {game.moves_played + 1}.')
+        game = game.play(PASS if move == _PASS_CODE else coordinates[move], validate)
+    return game
+
+
+def _checked(text: str):
+    # The plain values of a game that replays without error, for a worker to send back.
+    values = _parse_game(text)
+    _replay(*values)
+    return values
+
+
+def read_sgf(text: str):
+    return _replay(*_parse_game(text))
+
+
+def read_collection(stream: TextIO, chunk_size: int = 1 << 20):
+    # Yields the text of each top-level game tree in a stream of concatenated game trees, reading chunk_size characters
+    # at a time.
+    pieces = []
+    depth = 0
+    in_value = False
+    escaped = False
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        start = 0
+        position = 0
+        if escaped:
+            escaped = False
+            position = 1
+        while True:
+            match = _SPECIAL.search(chunk, position)
+            if match is None:
+                break
+            character = match.group()
+            position = match.end()
+            if in_value:
+                if character == '\\':
+                    if position == len(chunk):
+                        escaped = True
+                    position += 1
+                elif character == ']':
+                    in_value = False
+            elif character == '[':
+                in_value = True
+            elif character == '(':
+                if depth == 0:
+                    pieces = []
+                    start = match.start()
+                depth += 1
+            elif character == ')' and depth:
+                depth -= 1
+                if depth == 0:
+                    pieces.append(chunk[start:position])
+                    yield ''.join(pieces)
+                    pieces = []
+                    start = position
+        if depth:
+            pieces.append(chunk[start:])
+
+
+def _attempt(read, value, strict: bool):
+    try:
+        return read(value)
+    except Exception:
+        if strict:
+            raise
+        return None
+
+
+def read_games(paths: Iterable[str], workers: int = 0, strict: bool = False, chunk_size: int = 1 << 20):
+    # Yields a Game for every game tree in the given files, in order.  Games that cannot be read are skipped unless
+    # strict.  With workers, trees are parsed and replayed on a process pool while only a bounded window of them is in
+    # flight.
+    def texts():
+        for path in paths:
+            with open(path, encoding='utf-8', errors='replace') as stream:
+                yield from read_collection(stream, chunk_size)
+
+    if not workers:
+        for text in texts():
+            game = _attempt(read_sgf, text, strict)
+            if game is not None:
+                yield game
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for text in texts():
+            pending.append(executor.submit(_attempt, _checked, text, strict))
+            if len(pending) >= 4 * workers:
+                values = pending.popleft().result()
+                if values is not None:
+                    yield _replay(*values, validate=False)
+        while pending:
+            values = pending.popleft().result()
+            if values is not None:
+                yield _replay(*values, validate=False)
@@ -1,31 +1,96 @@
 #!/usr/bin/env python3
 
-from .color import Color
+from .color import Color, COLORS
 from .coordinate import get_coordinates, Coordinate
 from .constants import *
+import hashlib
 import random
 
+# The keys come from a private generator with a fixed seed, drawn in a fixed order, so every process (whatever its
+# start method or global random state) and every run builds the same table.  Hashes can therefore be shared between the
+# workers of a pool and stored on disk; FINGERPRINT identifies the table they belong to.  A second table, drawn from its
+# own generator, gives every board an independent check hash, so a position hash found in a History can be confirmed
+# by a second 64-bit match instead of comparing Boards.
 
-def _generate_hash():
-    return random.getrandbits(ZOBRIST_HASH_SIZE)
+_RANDOM = random.Random(ZOBRIST_SEED)
+_CHECK_RANDOM = random.Random(ZOBRIST_CHECK_SEED)
 
 
-def _create_coordinate_state_hashes():
+def _generate_hash(generator: random.Random = _RANDOM):
+    return generator.getrandbits(ZOBRIST_HASH_SIZE)
+
+
+def _create_coordinate_state_hashes(generator: random.Random = _RANDOM):
     cache = {}
     for coordinate in get_coordinates(MAX_SPAN):
         for color in Color:
-            zobrist_hash = _generate_hash()
+            zobrist_hash = _generate_hash(generator)
             cache[(coordinate, color)] = zobrist_hash
     return cache
 
 
 _COORDINATES = _create_coordinate_state_hashes()
+_CHECKS = _create_coordinate_state_hashes(_CHECK_RANDOM)
 
 
 def get_cell_hash(coordinate, color: Color):
     return _COORDINATES[(coordinate, color)]
 
 
+_SPAN_HASHES = {}
+
+
+def get_cell_hashes(span: int):
+    assert 1 <= span <= MAX_SPAN
+    if span not in _SPAN_HASHES:
+        _SPAN_HASHES[span] = tuple(
+            tuple(get_cell_hash(coordinate, color.simple) for color in COLORS)
+            for coordinate in get_coordinates(span)
+        )
+    return _SPAN_HASHES[span]
+
+
+def get_check_hash(coordinate, color: Color):
+    return _CHECKS[(coordinate, color)]
+
+
+_SPAN_CHECKS = {}
+
+
+def get_check_hashes(span: int):
+    assert 1 <= span <= MAX_SPAN
+    if span not in _SPAN_CHECKS:
+        _SPAN_CHECKS[span] = tuple(
+            tuple(get_check_hash(coordinate, color.simple) for color in COLORS)
+            for coordinate in get_coordinates(span)
+        )
+    return _SPAN_CHECKS[span]
+
+
+_SYMMETRIC_DELTAS = {}
+
+
+def get_symmetric_deltas(span: int):
+    # [index][current color index][next color index] -> for each of the 8 symmetries, what changing the cell does to
+    # the hash of the board moved by that symmetry.
+    assert 1 <= span <= MAX_SPAN
+    if span not in _SYMMETRIC_DELTAS:
+        hashes = get_cell_hashes(span)
+        symmetries = get_coordinates(span).symmetries
+        _SYMMETRIC_DELTAS[span] = tuple(
+            tuple(
+                tuple(
+                    tuple(hashes[images[index]][current.index] ^ hashes[images[index]][following.index]
+                          for images in symmetries)
+                    for following in COLORS
+                )
+                for current in COLORS
+            )
+            for index in range(len(hashes))
+        )
+    return _SYMMETRIC_DELTAS[span]
+
+
 _EMPTY_BOARDS = {}
 
 
@@ -39,6 +104,19 @@ def get_empty_board(span: int):
     return _EMPTY_BOARDS[span]
 
 
+_EMPTY_CHECKS = {}
+
+
+def get_empty_check(span: int):
+    assert 1 <= span <= MAX_SPAN
+    if span not in _EMPTY_CHECKS:
+        empty_check = 0
+        for coordinate in get_coordinates(span):
+            empty_check ^= get_check_hash(coordinate, Color.EMPTY)
+        _EMPTY_CHECKS[span] = empty_check
+    return _EMPTY_CHECKS[span]
+
+
 BLACK_TO_PLAY = _generate_hash()
 GAME_OVER = _generate_hash()
 WHITE_TO_PLAY = _generate_hash()
@@ -46,3 +124,19 @@ WHITE_TO_PLAY = _generate_hash()
 PREVIOUS_MOVE_PLAY = _generate_hash()
 PREVIOUS_MOVE_FIRST_PASS = _generate_hash()
 PREVIOUS_MOVE_SECOND_PASS = _generate_hash()
+
+
+def _fingerprint():
+    digest = hashlib.blake2b(digest_size=8)
+    for table in (_COORDINATES, _CHECKS):
+        for coordinate in get_coordinates(MAX_SPAN):
+            for color in Color:
+                digest.update(table[(coordinate, color)].to_bytes(ZOBRIST_HASH_SIZE // 8, 'little'))
+    for key in (
+        BLACK_TO_PLAY, GAME_OVER, WHITE_TO_PLAY, PREVIOUS_MOVE_PLAY, PREVIOUS_MOVE_FIRST_PASS, PREVIOUS_MOVE_SECOND_PASS
+    ):
+        digest.update(key.to_bytes(ZOBRIST_HASH_SIZE // 8, 'little'))
+    return int.from_bytes(digest.digest(), 'little')
+
+
+FINGERPRINT = _fingerprint()
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import inspect
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from go.color import Color
+from go.constants import MAX_SPAN
+from go.coordinate import PASS, get_coordinates
+from go.game import Game
+from go.outcome import Draw
+from ai.agent import Agent
+from ai.mtdf import MTDfAgent
+from ai.naive import NaiveAgent
+from ai.random import RandomAgent
+
+# A Go Text Protocol (version 2) front end for any Agent, over stdin/stdout or TCP.  Commands are handled one at a time
+# on an asyncio loop while searches run on a single worker thread, so the loop stays responsive and searches never
+# overlap.  Agents with a time_limit (MTDfAgent) are given a per-move budget by the TimeManager, and agents with a stop
+# hook are also cut off at a hard deadline.  After answering genmove, such an agent ponders: it searches the position
+# the opponent now faces until the next command arrives, which leaves its transposition table warm for the reply.
+#
+#   python gtp.py [--agent mtdf|naive|random] [--depth N] [--port PORT [--host HOST]]
+
+_LABELS = 'ABCDEFGHJKLMNOPQRST'
+_SAFETY = 0.1
+
+
+class GtpError(Exception):
+    pass
+
+
+class TimeManager:
+    def __init__(self):
+        self.main_time = None
+        self.byo_yomi_time = 0.
+        self.byo_yomi_stones = 0
+        self.left = {}
+
+    def time_settings(self, main_time: float, byo_yomi_time: float, byo_yomi_stones: int):
+        # GTP uses byo-yomi time with no stones to mean there is no time limit.
+        if byo_yomi_time > 0 and byo_yomi_stones == 0:
+            self.main_time = None
+        else:
+            self.main_time = main_time
+        self.byo_yomi_time = byo_yomi_time
+        self.byo_yomi_stones = byo_yomi_stones
+        self.left = {}
+
+    def time_left(self, color: Color, seconds: float, stones: int):
+        self.left[color] = (seconds, stones)
+
+    def spent(self, color: Color, seconds: float):
+        if color in self.left:
+            remaining, stones = self.left[color]
+            self.left[color] = (max(remaining - seconds, 0.), max(stones - 1, 0) if stones else 0)
+
+    def budget(self, color: Color, span: int, moves_played: int):
+        # Seconds to spend on the next move, or None when the game is untimed.
+        if self.main_time is None:
+            return None
+        remaining, stones = self.left.get(color, (self.main_time, 0))
+        if stones:
+            budget = remaining / stones
+        else:
+            expected = max(span * span // 3 - moves_played // 2, span)
+            budget = remaining / expected
+            if self.byo_yomi_stones:
+                budget += 0.5 * self.byo_yomi_time / self.byo_yomi_stones
+        return max(0.8 * budget - _SAFETY, 0.05)
+
+
+def _fixed_handicap(span: int, stones: int):
+    # The GTP specification allows up to nine stones on odd boards from 9x9 up and four on 7x7 and even boards.
+    if span < 7 or stones < 2 or stones > (9 if span % 2 and span >= 9 else 4):
+        raise GtpError('invalid number of stones')
+    low = 4 if span >= 13 else 3
+    high = span + 1 - low
+    middle = (span + 1) // 2
+    # (column, row from the bottom), in the order the GTP specification places them.
+    points = [(low, low), (high, high), (low, high), (high, low)]
+    if stones >= 6:
+        points += [(low, middle), (high, middle)]
+    if stones >= 8:
+        points += [(middle, low), (middle, high)]
+    if stones >= 5 and stones % 2:
+        points.append((middle, middle))
+    coordinates = get_coordinates(span)
+    return [coordinates.get(span + 1 - row, column) for column, row in points[:stones]]
+
+
+class GtpEngine:
+    def __init__(self, agent: Agent, name: str = 'go', version: str = '0.1'):
+        self.agent = agent
+        self.name = name
+        self.version = version
+        self.span = 19
+        self.compensation = 0.
+        self.game = Game(span=self.span, compensation=self.compensation)
+        self.time_manager = TimeManager()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pondering = None
+        self._stop = threading.Event()
+        self._commands = {
+            'protocol_version': self._protocol_version,
+            'name': lambda: self.name,
+            'version': lambda: self.version,
+            'known_command': self._known_command,
+            'list_commands': lambda: '\n'.join(sorted(self._commands)),
+            'quit': lambda: '',
+            'boardsize': self._boardsize,
+            'clear_board': self._clear_board,
+            'komi': self._komi,
+            'fixed_handicap': self._handicap,
+            'place_free_handicap': self._handicap,
+            'set_free_handicap': self._set_free_handicap,
+            'play': self._play,
+            'genmove': self._genmove,
+            'undo': self._undo,
+            'final_score': self._final_score,
+            'showboard': lambda: '\n' + str(self.game.board).rstrip('\n'),
+            'time_settings': self._time_settings,
+            'time_left': self._time_left,
+        }
+
+    async def handle(self, line: str):
+        # Returns the full response to one line of input, or None for a line that is not a command.
+        line = ''.join(character for character in line.split('#', 1)[0] if character >= ' ' or character == '\t')
+        words = line.replace('\t', ' ').split()
+        if not words:
+            return None
+        identifier = ''
+        if words[0].isdigit():
+            identifier = words.pop(0)
+            if not words:
+                return None
+        command, arguments = words[0], words[1:]
+
+        await self.stop_pondering()
+        try:
+            handler = self._commands.get(command)
+            if handler is None:
+                raise GtpError('unknown command')
+            try:
+                inspect.signature(handler).bind(*arguments)
+            except TypeError:
+                raise GtpError('syntax error') from None
+            result = handler(*arguments)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except Exception as error:
+            # Any failure, including a bug in a handler or the agent, answers this command alone; the session goes on.
+            message = ' '.join(str(error).split()) or type(error).__name__
+            return f'?{identifier} {message}\n\n'
+        result = '' if result is None else result
+        return f'={identifier} {result}'.rstrip(' ') + '\n\n'
+
+    def close(self):
+        self._stop.set()
+        self._executor.shutdown(wait=True)
+
+    def _protocol_version(self):
+        return '2'
+
+    def _known_command(self, command: str):
+        return 'true' if command in self._commands else 'false'
+
+    def _boardsize(self, span: str):
+        span = self._parse_number(int, span)
+        if not 1 <= span <= MAX_SPAN:
+            raise GtpError('unacceptable size')
+        self.span = span
+        self._clear_board()
+
+    def _clear_board(self):
+        self.game = Game(span=self.span, compensation=self.compensation)
+
+    def _komi(self, compensation: str):
+        self.compensation = self._parse_number(float, compensation)
+        self.game = self._replay(self.game, compensation=self.compensation)
+
+    def _replay(self, game: Game, compensation: float = None, handicap_stones=None):
+        moves = []
+        state = game
+        while state.previous_state is not None:
+            moves.append(state.previous_move)
+            state = state.previous_state
+        replayed = Game(
+            rules=state.rules,
+            span=self.span,
+            compensation=state.compensation if compensation is None else compensation,
+            handicap_placement=handicap_stones if handicap_stones is not None else state.handicap_stones or None
+        )
+        for move in reversed(moves):
+            replayed = replayed.play(move)
+        return replayed
+
+    def _place_handicap(self, stones):
+        if self.game.moves_played or self.game.handicap_stones:
+            raise GtpError('board not empty')
+        if len(set(stones)) != len(stones):
+            raise GtpError('repeated vertex')
+        self.game = Game(span=self.span, compensation=self.compensation, handicap_placement=stones)
+
+    def _handicap(self, stones: str):
+        placement = _fixed_handicap(self.span, self._parse_number(int, stones))
+        self._place_handicap(placement)
+        return ' '.join(self._vertex(stone) for stone in placement)
+
+    def _set_free_handicap(self, *vertices):
+        if len(vertices) < 2:
+            raise GtpError('syntax error')
+        stones = [self._parse_vertex(vertex) for vertex in vertices]
+        if PASS in stones:
+            raise GtpError('syntax error')
+        self._place_handicap(stones)
+
+    def _turn(self, player: Color):
+        # GTP lets the controller move either color at any time (e.g. to set up a position), so a move out of turn is
+        # taken as a pass by the other side followed by the move; when player has just passed, that pass is dropped
+        # instead, since the other side passing as well would end the game.
+        game = self.game
+        if player is game.current_player:
+            return game
+        if game.previous_move is PASS:
+            return game.previous_state
+        return game.play(PASS)
+
+    def _play(self, color: str, vertex: str):
+        player = self._parse_color(color)
+        move = self._parse_vertex(vertex)
+        if self.game.over:
+            raise GtpError('illegal move')
+        game = self._turn(player)
+        if move not in game.legal_moves:
+            raise GtpError('illegal move')
+        self.game = game.play(move)
+
+    async def _genmove(self, color: str):
+        player = self._parse_color(color)
+        if self.game.over:
+            return 'pass'
+        game = self._turn(player)
+        budget = self.time_manager.budget(player, self.span, game.moves_played)
+        started = time.monotonic()
+        move = await self._search(game, budget)
+        self.time_manager.spent(player, time.monotonic() - started)
+        if move not in game.legal_moves:
+            move = PASS
+        self.game = game.play(move)
+        self._start_pondering()
+        return self._vertex(move)
+
+    def _undo(self):
+        if self.game.previous_state is None:
+            raise GtpError('cannot undo')
+        self.game = self.game.previous_state
+
+    def _final_score(self):
+        game = self.game
+        while not game.over:
+            game = game.play(PASS)
+        outcome = game.score().outcome
+        if isinstance(outcome, Draw):
+            return '0'
+        return f'{"B" if outcome.winner is Color.BLACK else "W"}+{outcome.margin:g}'
+
+    def _time_settings(self, main_time: str, byo_yomi_time: str, byo_yomi_stones: str):
+        self.time_manager.time_settings(
+            self._parse_number(float, main_time),
+            self._parse_number(float, byo_yomi_time),
+            self._parse_number(int, byo_yomi_stones)
+        )
+
+    def _time_left(self, color: str, seconds: str, stones: str):
+        self.time_manager.time_left(
+            self._parse_color(color), self._parse_number(float, seconds), self._parse_number(int, stones)
+        )
+
+    async def _search(self, game: Game, budget: float):
+        loop = asyncio.get_running_loop()
+        self._stop.clear()
+        timer = None
+        if budget is not None and hasattr(self.agent, 'stop'):
+            timer = loop.call_later(1.5 * budget + _SAFETY, self._stop.set)
+        try:
+            return await loop.run_in_executor(self._executor, self._select_move, game, budget)
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def _select_move(self, game: Game, budget: float):
+        agent = self.agent
+        saved = {}
+        if hasattr(agent, 'time_limit'):
+            saved['time_limit'] = agent.time_limit
+            agent.time_limit = budget if budget is not None else agent.time_limit
+        if hasattr(agent, 'stop'):
+            saved['stop'] = agent.stop
+            agent.stop = self._stop.is_set
+        try:
+            return agent.select_move(game)
+        finally:
+            for attribute, value in saved.items():
+                setattr(agent, attribute, value)
+
+    def _start_pondering(self):
+        if not hasattr(self.agent, 'stop') or self.game.over:
+            return
+        loop = asyncio.get_running_loop()
+        self._stop.clear()
+        self._pondering = loop.run_in_executor(self._executor, self._select_move, self.game, None)
+
+    async def stop_pondering(self):
+        if self._pondering is None:
+            return
+        self._stop.set()
+        try:
+            await self._pondering
+        except Exception:
+            # Pondering only warms the agent up for the next move, so a failed ponder costs nothing else.
+            pass
+        finally:
+            self._pondering = None
+
+    @staticmethod
+    def _parse_number(kind, value: str):
+        try:
+            return kind(value)
+        except ValueError:
+            raise GtpError('syntax error') from None
+
+    @staticmethod
+    def _parse_color(color: str):
+        color = color.lower()
+        if color in ('b', 'black'):
+            return Color.BLACK
+        if color in ('w', 'white'):
+            return Color.WHITE
+        raise GtpError('syntax error')
+
+    def _parse_vertex(self, vertex: str):
+        vertex = vertex.upper()
+        if vertex == 'PASS':
+            return PASS
+        column = _LABELS.find(vertex[:1]) + 1
+        if not column or not vertex[1:].isdecimal():
+            raise GtpError('syntax error')
+        row = self.span + 1 - int(vertex[1:])
+        if column > self.span or not 1 <= row <= self.span:
+            raise GtpError('illegal move')
+        return get_coordinates(self.span).get(row, column)
+
+    def _vertex(self, move):
+        if move == PASS:
+            return 'pass'
+        return f'{_LABELS[move.column - 1]}{self.span + 1 - move.row}'
+
+
+async def serve_stdio(engine: GtpEngine):
+    loop = asyncio.get_running_loop()
+    reader = ThreadPoolExecutor(max_workers=1)
+    try:
+        while True:
+            line = await loop.run_in_executor(reader, sys.stdin.readline)
+            if not line:
+                break
+            response = await engine.handle(line)
+            if response is None:
+                continue
+            sys.stdout.write(response)
+            sys.stdout.flush()
+            if _is_quit(line):
+                break
+    finally:
+        await engine.stop_pondering()
+        engine.close()
+        reader.shutdown(wait=False)
+
+
+def _is_quit(line: str):
+    words = line.split('#', 1)[0].split()
+    if words and words[0].isdigit():
+        words = words[1:]
+    return words[:1] == ['quit']
+
+
+async def serve_tcp(create_engine: Callable[[], GtpEngine], host: str, port: int):
+    # Every connection gets an engine of its own.
+    async def session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        engine = create_engine()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode('utf-8', errors='replace')
+                response = await engine.handle(line)
+                if response is None:
+                    continue
+                writer.write(response.encode('utf-8'))
+                await writer.drain()
+                if _is_quit(line):
+                    break
+        finally:
+            await engine.stop_pondering()
+            engine.close()
+            writer.close()
+
+    server = await asyncio.start_server(session, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+_AGENTS = {
+    'mtdf': MTDfAgent,
+    'naive': NaiveAgent,
+    'random': RandomAgent,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Go Text Protocol engine.')
+    parser.add_argument('--agent', choices=sorted(_AGENTS), default='mtdf')
+    parser.add_argument('--depth', type=int, default=None, help='maximum search depth for mtdf')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help='listen on TCP instead of stdin/stdout')
+    options = parser.parse_args()
+
+    def create_engine():
+        agent = _AGENTS[options.agent]()
+        if options.depth is not None and hasattr(agent, 'max_depth'):
+            agent.max_depth = options.depth
+        return GtpEngine(agent, name=f'go-{options.agent}')
+
+    try:
+        if options.port is None:
+            asyncio.run(serve_stdio(create_engine()))
+        else:
+            asyncio.run(serve_tcp(create_engine, options.host, options.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import signal
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Iterable
+from go import instrumentation, zobrist
+from go.color import Color
+from go.coordinate import get_coordinates
+from go.game import Game
+from go.outcome import Draw
+from ai.agent import Agent
+from ai.dataset import RecordWriter
+
+# MatchRunner spreads series of matches over a process pool.  Agents are given as factories (usually the Agent class
+# itself) so that each worker builds its own instances once instead of unpickling them for every game.  Each game is
+# played after seeding the worker's global random state with a seed drawn from the runner's seed, so a series gives the
+# same results whatever the worker count.  Given a record directory, every task also writes its scored games to a shard
+# of its own there, named after the series and the task's first game.  With instrument set, the workers count their hot
+# paths (see go.instrumentation) and the runner gathers every game's and every worker's totals; with profile_directory
+# set, each game is also profiled with cProfile into that directory.
+
+
+def play_match(weaker: Agent, stronger: Agent, handicap: int, print_updates=False, writer: RecordWriter = None):
+    if instrumentation.active():
+        return instrumentation.observe(_play_match, weaker, stronger, handicap, print_updates, writer).outcome
+    return _play_match(weaker, stronger, handicap, print_updates, writer).outcome
+
+
+def _play_match(weaker: Agent, stronger: Agent, handicap: int, print_updates: bool, writer: RecordWriter):
+    players = {Color.BLACK: weaker, Color.WHITE: stronger}
+    if handicap:
+        compensation = -7
+        if handicap > 1:
+            coordinates = get_coordinates(9)
+            handicap_stones = [coordinates.get(7, 3), coordinates.get(3, 7)]
+            if handicap > 2:
+                handicap_stones.append(coordinates.get(7, 7))
+            if handicap > 3:
+                handicap_stones.append(coordinates.get(3, 3))
+            if handicap in (5, 7, 9):
+                handicap_stones.append(coordinates.get(5, 5))
+            if handicap > 5:
+                handicap_stones.append(coordinates.get(3, 5))
+                handicap_stones.append(coordinates.get(7, 5))
+            if handicap > 7:
+                handicap_stones.append(coordinates.get(5, 3))
+                handicap_stones.append(coordinates.get(5, 7))
+        else:
+            handicap_stones = None
+    else:
+        compensation = 7
+        handicap_stones = None
+    game = Game(span=9, compensation=compensation, handicap_placement=handicap_stones)
+    while not game.over:
+        if print_updates:
+            print(game)
+        agent = players[game.current_player]
+        move = instrumentation.select_move(agent, game)
+        game = game.play(move)
+    if print_updates:
+        print(game)
+    game = game.score()
+    if print_updates:
+        print(game)
+    if writer is not None:
+        writer.write(game)
+    return game
+
+
+class Series:
+    def __init__(
+        self,
+        key,
+        weaker: Callable[[], Agent],
+        stronger: Callable[[], Agent],
+        handicap: int,
+        color: Color,
+        games: int
+    ):
+        self.key = key
+        self.weaker = weaker
+        self.stronger = stronger
+        self.handicap = handicap
+        self.color = color
+        self.games = games
+
+
+_agents = {}
+
+
+def _initialize_worker(fingerprint: int, instrument: bool = False, profile_directory: str = None):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if zobrist.FINGERPRINT != fingerprint:
+        raise Exception('This worker built a different Zobrist table than the process that started it.')
+    if instrument or profile_directory:
+        instrumentation.reset()
+    if instrument:
+        instrumentation.enable()
+    if profile_directory:
+        instrumentation.set_profiler(instrumentation.CProfiler(profile_directory))
+
+
+def _agent(factory: Callable[[], Agent]):
+    if factory not in _agents:
+        _agents[factory] = factory()
+    return _agents[factory]
+
+
+def _play_games(weaker, stronger, handicap: int, color: Color, seeds, path: str = None):
+    results = [0, 0, 0]
+    writer = RecordWriter(path) if path else None
+    try:
+        for seed in seeds:
+            random.seed(seed)
+            outcome = play_match(_agent(weaker), _agent(stronger), handicap, writer=writer)
+            if isinstance(outcome, Draw):
+                results[1] += 1
+            elif outcome.winner is color:
+                results[0] += 1
+            else:
+                results[2] += 1
+    finally:
+        if writer is not None:
+            writer.close()
+    if not instrumentation.active():
+        return results, None
+    report = os.getpid(), instrumentation.snapshot(), instrumentation.games[:]
+    instrumentation.games.clear()
+    return results, report
+
+
+class MatchRunner:
+    def __init__(
+        self,
+        workers: int = None,
+        seed: int = 0,
+        games_per_task: int = 5,
+        record_directory: str = None,
+        instrument: bool = False,
+        profile_directory: str = None
+    ):
+        assert games_per_task > 0
+        self.workers = workers if workers else os.cpu_count() or 1
+        self.seed = seed
+        self.games_per_task = games_per_task
+        self.record_directory = record_directory
+        self.instrument = instrument
+        self.profile_directory = profile_directory
+        self.shards = []
+        self.game_snapshots = []
+        self.process_snapshots = {}
+        self.cancelled = False
+
+    @property
+    def counters(self):
+        # The totals of every worker, as of the last task each of them finished.
+        totals = Counter()
+        for snapshot in self.process_snapshots.values():
+            totals.update(snapshot)
+        return totals
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self, schedule: Iterable[Series]):
+        # Yields (key, [wins, draws, losses]) for each Series in schedule order, as soon as it and every Series before
+        # it have finished.  Cancelling (or interrupting) stops the remaining games and ends the iteration early.
+        self.cancelled = False
+        self.shards = []
+        self.game_snapshots = []
+        self.process_snapshots = {}
+        if self.record_directory:
+            os.makedirs(self.record_directory, exist_ok=True)
+        schedule = list(schedule)
+        rng = random.Random(self.seed)
+        results = [[0, 0, 0] for _ in schedule]
+        remaining = [0] * len(schedule)
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_initialize_worker,
+            initargs=(zobrist.FINGERPRINT, self.instrument, self.profile_directory)
+        )
+        pending = {}
+        try:
+            for number, series in enumerate(schedule):
+                seeds = [rng.getrandbits(64) for _ in range(series.games)]
+                for start in range(0, series.games, self.games_per_task):
+                    path = None
+                    if self.record_directory:
+                        path = os.path.join(self.record_directory, f'{number:04}-{start:06}.games')
+                    future = executor.submit(
+                        _play_games,
+                        series.weaker,
+                        series.stronger,
+                        series.handicap,
+                        series.color,
+                        seeds[start:start + self.games_per_task],
+                        path
+                    )
+                    pending[future] = number, path
+                    remaining[number] += 1
+
+            reported = 0
+            while not self.cancelled:
+                while reported < len(schedule) and not remaining[reported]:
+                    yield schedule[reported].key, results[reported]
+                    reported += 1
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    number, path = pending.pop(future)
+                    if path:
+                        self.shards.append(path)
+                    counts, report = future.result()
+                    for index, count in enumerate(counts):
+                        results[number][index] += count
+                    if report is not None:
+                        process, snapshot, game_snapshots = report
+                        self.process_snapshots[process] = snapshot
+                        self.game_snapshots.extend(game_snapshots)
+                    remaining[number] -= 1
+        except KeyboardInterrupt:
+            self.cancelled = True
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
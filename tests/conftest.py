@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import pytest
+
+# The modules live in src and import one another as top-level packages (go, ai, benchmarks), so src goes on the path.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from games import VARIANTS, rule_set  # noqa: E402
+
+
+@pytest.fixture(params=VARIANTS, ids=lambda variant: f'{variant[0].name}-suicide-{variant[1].name}')
+def variant(request):
+    return rule_set(*request.param)
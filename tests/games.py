@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+import copy
+import random
+from go import rules
+from go.coordinate import PASS
+from go.game import Game
+from go.rules import Ko, Suicide
+
+# Random games for the tests that follow a Game move by move.  VARIANTS is TRAINING under every combination of the two
+# rules that decide legality, ko and suicide.
+
+VARIANTS = [(ko, suicide) for ko in Ko for suicide in Suicide]
+
+
+def rule_set(ko: Ko, suicide: Suicide):
+    variant = copy.copy(rules.TRAINING)
+    variant.ko = ko
+    variant.suicide = suicide
+    return variant
+
+
+def random_games(rule_set: rules.RuleSet, seed: int, games: int = 6, double_hash: bool = False, spans=(2, 3, 4, 5)):
+    # Every Game along seeded random games on small boards, where captures and repetitions come up often.
+    rng = random.Random(seed)
+    for _ in range(games):
+        span = rng.choice(spans)
+        game = Game(rules=rule_set, span=span, double_hash=double_hash)
+        yield game
+        while not game.over and game.moves_played < 4 * span * span:
+            moves = sorted(game.legal_moves, key=lambda move: -1 if move == PASS else move.index)
+            game = game.play(PASS if rng.random() < 0.03 else rng.choice(moves))
+            yield game
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import pytest
+from go.board import Board
+from go.color import Color
+from go.coordinate import Coordinate, get_coordinates
+
+
+def test_subscripts_match_by_row_and_column():
+    board = Board(span=9)
+    assert board[Coordinate(3, 3)] is Color.EMPTY
+    board[Coordinate(3, 3)] = Color.BLACK
+    board[get_coordinates(19).get(5, 5)] = Color.WHITE
+    coordinates = get_coordinates(9)
+    assert board[coordinates.get(3, 3)] is Color.BLACK
+    assert board[coordinates.get(5, 5)] is Color.WHITE
+    assert [coordinate for coordinate, color in board if color is not Color.EMPTY] == [
+        coordinates.get(3, 3), coordinates.get(5, 5)
+    ]
+    assert board.group(Coordinate(5, 5)).members == {coordinates.get(5, 5)}
+
+
+def test_subscripts_reject_points_off_the_board():
+    board = Board(span=9)
+    with pytest.raises(KeyError):
+        board[get_coordinates(19).get(12, 12)]
+    with pytest.raises(KeyError):
+        board[Coordinate(0, 4)] = Color.BLACK
+
+
+def test_copies_do_not_share_writes():
+    board = Board(span=5)
+    coordinates = board.coordinates
+    board[coordinates.get(2, 2)] = Color.BLACK
+    copy = Board(source=board)
+    copy[coordinates.get(3, 3)] = Color.WHITE
+    board[coordinates.get(4, 4)] = Color.BLACK
+    assert copy[coordinates.get(4, 4)] is Color.EMPTY
+    assert board[coordinates.get(3, 3)] is Color.EMPTY
+    assert copy[coordinates.get(2, 2)] is Color.BLACK
+    assert copy.position != board.position
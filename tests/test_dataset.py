@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import math
+import os
+import random
+import pytest
+from ai.dataset import INDEX_SUFFIX, Dataset, GameRecords, RecordWriter, build_index
+from go import rules
+from go.coordinate import PASS, get_coordinates
+from go.game import Game
+
+
+def _play(rule_set: rules.RuleSet, span: int, seed: int, double_hash: bool = False, handicap=(), finish: bool = True):
+    # A random game, finished and scored or left in progress after a few moves.
+    rng = random.Random(seed)
+    coordinates = get_coordinates(span)
+    game = Game(
+        rules=rule_set,
+        span=span,
+        compensation=6.5,
+        handicap_placement=[coordinates.get(*point) for point in handicap] or None,
+        double_hash=double_hash
+    )
+    while not game.over and (finish or game.moves_played < 5):
+        moves = sorted(game.legal_moves, key=lambda move: -1 if move == PASS else move.index)
+        game = game.play(PASS if game.moves_played > 3 * span * span or rng.random() < 0.05 else rng.choice(moves))
+    return game.score() if game.over else game
+
+
+def _moves(game: Game):
+    moves = []
+    while game.previous_state is not None:
+        if game.moves_played != game.previous_state.moves_played:
+            moves.append(game.previous_move)
+        game = game.previous_state
+    return moves[::-1]
+
+
+def _games():
+    return [
+        _play(rules.TRAINING, 5, 0),
+        _play(rules.JAPANESE, 7, 1, double_hash=True, handicap=((3, 3), (5, 5))),
+        _play(rules.AGA, 5, 2, finish=False),
+        _play(rules.TROMP_TAYLOR, 9, 3, double_hash=True),
+        _play(rules.CHINESE, 4, 4),
+    ]
+
+
+def _write(path: str, games):
+    with RecordWriter(path) as writer:
+        for game in games:
+            writer.write(game)
+
+
+def _same(record, game: Game):
+    start = record.start()
+    assert record.span == game.board.span
+    assert record.compensation == game.compensation
+    assert vars(record.rules) == vars(game.rules)
+    assert start.rules is record.rules and start.double_hash == record.double_hash == game.double_hash
+    assert start.handicap_stones == game.handicap_stones
+    assert [record.move(number) for number in range(len(record))] == _moves(game)
+    if game.outcome.margin is None:
+        assert math.isnan(record.margin)
+    else:
+        assert record.margin == game.outcome.black_score - game.outcome.white_score
+    final = None
+    for final in record.replay():
+        pass
+    assert final.board.position == game.board.position
+
+
+def test_records_round_trip(tmp_path):
+    games = _games()
+    path = str(tmp_path / 'games.bin')
+    _write(path, games)
+    with GameRecords(path) as records:
+        assert len(records) == len(games)
+        assert records.positions == sum(len(_moves(game)) for game in games)
+        for record, game in zip(records, games):
+            _same(record, game)
+        assert [record.double_hash for record in records] == [False, True, False, True, False]
+        assert math.isnan(records[2].margin)
+
+
+def test_positions_match_replays(tmp_path):
+    games = _games()
+    path = str(tmp_path / 'games.bin')
+    _write(path, games)
+    with GameRecords(path) as records:
+        number = 0
+        for game in games:
+            moves = _moves(game)
+            for move_number, move in enumerate(moves):
+                state, played, margin = records.position(number)
+                assert records.locate(number) == (games.index(game), move_number)
+                assert played == move
+                assert state.moves_played == move_number
+                number += 1
+
+
+def test_missing_index_is_rebuilt(tmp_path):
+    games = _games()
+    path = str(tmp_path / 'games.bin')
+    _write(path, games)
+    with open(path + INDEX_SUFFIX, 'rb') as index:
+        written = index.read()
+    os.remove(path + INDEX_SUFFIX)
+    with GameRecords(path) as records:
+        assert len(records) == len(games)
+    with open(path + INDEX_SUFFIX, 'rb') as index:
+        assert index.read() == written
+
+
+def test_truncated_record_is_dropped_from_the_index(tmp_path):
+    games = _games()
+    path = str(tmp_path / 'games.bin')
+    _write(path, games)
+    with open(path, 'rb+') as shard:
+        shard.truncate(os.path.getsize(path) - 1)
+    build_index(path)
+    with GameRecords(path) as records:
+        assert len(records) == len(games) - 1
+        for record, game in zip(records, games):
+            _same(record, game)
+
+
+def test_dataset_spans_shards(tmp_path):
+    games = _games()
+    paths = [str(tmp_path / 'first.bin'), str(tmp_path / 'second.bin')]
+    _write(paths[0], games[:2])
+    _write(paths[1], games[2:])
+    with Dataset(paths) as dataset:
+        assert len(dataset) == sum(len(_moves(game)) for game in games)
+        assert [record.span for record in dataset.games()] == [game.board.span for game in games]
+        first = len(_moves(games[0])) + len(_moves(games[1]))
+        state, move, margin = dataset.position(first)
+        assert state.board.span == games[2].board.span and move == _moves(games[2])[0] and math.isnan(margin)
+        assert len(dataset.sample(10, random.Random(0))) == 10
+
+
+def test_unknown_rules_are_refused(tmp_path):
+    rule_set = rules.RuleSet(**vars(rules.TRAINING))
+    rule_set.ko = rules.Ko.SIMPLE
+    with RecordWriter(str(tmp_path / 'games.bin')) as writer:
+        with pytest.raises(Exception):
+            writer.write(Game(rules=rule_set, span=5))
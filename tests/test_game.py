@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+import pytest
+from go import rules
+from go.coordinate import get_coordinates
+from go.game import Game
+
+
+def test_positional_arguments_keep_their_meaning():
+    coordinates = get_coordinates(9)
+    game = Game(9, 6.5, [coordinates.get(3, 3), coordinates.get(7, 7)])
+    assert game.board.span == 9
+    assert game.compensation == 6.5
+    assert game.handicap == 2
+    assert vars(game.rules) == vars(rules.TRAINING)
+    assert not game.double_hash
+
+
+@pytest.mark.parametrize('name', ['TRAINING', 'AGA', 'CHINESE', 'JAPANESE', 'TROMP_TAYLOR'])
+def test_rules_and_double_hash_carry_through_play(name):
+    game = Game(5, rules=getattr(rules, name), double_hash=True)
+    game = game.play(game.board.coordinates.get(3, 3))
+    assert game.rules is getattr(rules, name)
+    assert game.double_hash
+
+
+def test_rules_are_keyword_only():
+    with pytest.raises(TypeError):
+        Game(5, 0, None, None, None, 0, None, None, 0, 0, rules.JAPANESE)
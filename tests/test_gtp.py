@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import asyncio
+from ai.agent import Agent
+from ai.random import RandomAgent
+from gtp import GtpEngine
+
+
+class _Failing(Agent):
+    def __init__(self, error: Exception):
+        super().__init__()
+        self.error = error
+
+    def select_move(self, game):
+        raise self.error
+
+
+def _session(agent: Agent, *lines):
+    async def run():
+        engine = GtpEngine(agent)
+        try:
+            return [await engine.handle(line) for line in lines]
+        finally:
+            engine.close()
+    return asyncio.run(run())
+
+
+def test_bad_arguments_are_syntax_errors():
+    assert _session(RandomAgent(), '1 boardsize', '2 boardsize 9 9', '3 boardsize nine', '4 komi x', '5 play b z9') == [
+        '?1 syntax error\n\n', '?2 syntax error\n\n', '?3 syntax error\n\n', '?4 syntax error\n\n',
+        '?5 syntax error\n\n'
+    ]
+
+
+def test_failures_answer_the_command_and_the_session_goes_on():
+    responses = _session(
+        _Failing(TypeError('bad\nagent')), '1 boardsize 5', '2 genmove b', '3 play b c3', '4 genmove w', '5 name'
+    )
+    assert responses[0] == '=1\n\n'
+    assert responses[1] == '?2 bad agent\n\n'
+    assert responses[2] == '=3\n\n'
+    assert responses[3] == '?4 bad agent\n\n'
+    assert responses[4] == '=5 go\n\n'
+
+
+def test_moves_out_of_turn_and_handicap_limits():
+    responses = _session(RandomAgent(), 'boardsize 7', 'fixed_handicap 5', 'fixed_handicap 4', 'play b d4', 'play w b2')
+    assert responses[0] == '=\n\n'
+    assert responses[1] == '? invalid number of stones\n\n'
+    assert responses[2].startswith('= ')
+    assert responses[3:] == ['=\n\n', '=\n\n']
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+from games import random_games
+from go.color import COLORS
+
+# mark_unplayable looks only at the candidate points, so every Game along random games is checked against
+# Game._prepare_reference, which places a stone on every empty point and flood-fills the result.
+
+
+def _enclosed(board):
+    liberty = [color.counts_as_liberty for color in COLORS]
+    return sum(
+        1 << index for index, neighbors in enumerate(board.coordinates.neighbor_indices)
+        if liberty[board.cells[index]] and not any(liberty[board.cells[neighbor]] for neighbor in neighbors)
+    )
+
+
+def test_marks_match_reference(variant):
+    for seed, double_hash in enumerate((False, True)):
+        for game in random_games(variant, seed, double_hash=double_hash):
+            if game.previous_state is not None and not game.over:
+                assert game.board.cells == game.previous_state._prepare_reference(game._board).cells, str(game.board)
+
+
+def test_enclosed_follows_the_board(variant):
+    for game in random_games(variant, 2, spans=(1, 2, 3, 4, 7)):
+        assert game._board.enclosed == _enclosed(game._board)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import json
+import pytest
+from benchmarks import perft
+from go.game import Game
+from go.search import SearchPosition
+
+# The node counts stored in perft.json, recounted with Game.play, with SearchPosition and, on the seeds that are cheap
+# enough, with the reference legality.
+
+with open(perft.BASELINES) as _stream:
+    _BASELINES = json.load(_stream)
+
+_REFERENCE_SEEDS = ('empty-2', 'empty-3', 'ko-5', 'ko-5-japanese', 'ko-5-tromp-taylor', 'repeat-2', 'repeat-2-japanese',
+                    'repeat-2-aga')
+
+
+def _counts(name: str):
+    counts = [0] * perft.SEEDS[name][4]
+    perft._walk(perft.seed_game(name), 0, counts, [])
+    return counts
+
+
+@pytest.mark.parametrize('name', list(perft.SEEDS))
+def test_counts(name):
+    assert _counts(name) == _BASELINES[name]['counts']
+
+
+@pytest.mark.parametrize('name', list(perft.SEEDS))
+def test_search_counts(name):
+    counts = [0] * perft.SEEDS[name][4]
+    perft._walk_search(SearchPosition(perft.seed_game(name)), 0, counts)
+    assert counts == _BASELINES[name]['counts']
+
+
+@pytest.mark.parametrize('name', _REFERENCE_SEEDS)
+def test_reference_counts(name, monkeypatch):
+    monkeypatch.setattr(Game, '_prepare', lambda game, board, *_: game._prepare_reference(board))
+    assert _counts(name) == _BASELINES[name]['counts']
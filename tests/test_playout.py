@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import random
+from collections import Counter
+from go import rules
+from go.color import Color
+from go.coordinate import PASS
+from go.game import Game
+from go.playout import PlayoutEngine
+
+# Playouts are replayed through Game.play, under simple ko as the engine plays, and must reach the same board and
+# score.
+
+
+class _Recording(PlayoutEngine):
+    def run(self, game: Game = None):
+        self.played = []
+        return super().run(game)
+
+    def _place(self, index: int, player: int):
+        self.played.append((index, player))
+        super()._place(index, player)
+
+
+def _replay(game: Game, played):
+    coordinates = game.board.coordinates
+    for index, player in played:
+        if game.current_player.index != player:
+            game = game.play(PASS)
+        game = game.play(coordinates[index])
+    while not game.over:
+        game = game.play(PASS)
+    return game
+
+
+def _unmarked(cells):
+    return bytes(Color.EMPTY.index if cell == Color.UNPLAYABLE.index else cell for cell in cells)
+
+
+def test_playouts_replay_through_game():
+    rng = random.Random(0)
+    for span in (4, 5, 7, 9):
+        engine = _Recording(span, rng=random.Random(span))
+        for _ in range(15):
+            start = Game(rules=rules.JAPANESE, span=span, compensation=6.5)
+            for _ in range(rng.randrange(2 * span)):
+                start = start.play(rng.choice(sorted(
+                    (move for move in start.legal_moves if move != PASS), key=lambda move: move.index
+                )))
+            outcome = engine.run(start)
+            game = _replay(start, engine.played)
+            assert _unmarked(game.board.cells) == bytes(engine.cells)
+            scored = game.score().outcome
+            assert (scored.black_score, scored.white_score) == (outcome.black_score, outcome.white_score)
+
+
+def test_moves_are_drawn_uniformly():
+    # Black's three eyes along the top edge come first in the empty points and are always rejected; the 15 points below
+    # the wall must each be drawn equally often.
+    game = Game(rules=rules.JAPANESE, span=5)
+    coordinates = game.board.coordinates
+    for row, column in ((1, 2), (1, 4), (2, 1), (2, 2), (2, 3), (2, 4), (2, 5)):
+        game = game.play(coordinates.get(row, column)).play(PASS)
+    engine = PlayoutEngine(5, move_limit=1, rng=random.Random(0))
+    engine.load(game)
+    before = game.board.cells
+    drawn = Counter()
+    for _ in range(6000):
+        engine.run()
+        (index,) = [index for index, cell in enumerate(engine.cells) if cell != before[index]]
+        drawn[index] += 1
+    assert sorted(drawn) == list(range(10, 25))
+    assert all(300 < count < 500 for count in drawn.values())
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+from games import random_games
+from go.coordinate import PASS
+from go.game import Game
+from go.position import PASS_MOVE, Position
+
+# Position is checked against the Game it stands in for, move by move, along lines long enough for superko to reach
+# back past the root.
+
+
+def _legal(game: Game):
+    return {PASS_MOVE if move == PASS else move.index for move in game.legal_moves}
+
+
+def test_position_follows_game(variant):
+    for seed, double_hash in enumerate((False, True)):
+        node = None
+        for game in random_games(variant, seed, double_hash=double_hash):
+            if game.previous_state is None:
+                node = Position.from_game(game)
+            else:
+                node = node.play(PASS_MOVE if game.previous_move == PASS else game.previous_move.index)
+            if not game.over:
+                assert set(node.legal_moves()) == _legal(game)
+            assert node.position == game.board.position
+            assert node.check == game.board.check
+            assert node.ko == (game.ko_point.index if game.ko_point is not None else -1)
+            if game.moves_played % 7 == 3 and not game.over:
+                assert set(Position.from_game(game).legal_moves()) == _legal(game)
+
+
+def test_position_to_game():
+    game = Game(span=5)
+    node = Position.from_game(game)
+    for move in (6, 7, PASS_MOVE, 12, 8):
+        node = node.play(move)
+        game = game.play(PASS if move == PASS_MOVE else game.board.coordinates[move])
+    assert node.to_game().board == game.board
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import random
+from go.board import Board
+from go.color import Color
+from go.coordinate import PASS
+from go.game import Game
+from go.pointset import PointSet
+from go.scoring import get_scoring_engine, score_games
+
+# The bit-parallel area count against the same count made from PointSet regions.
+
+_CELLS = (Color.EMPTY, Color.EMPTY, Color.BLACK, Color.WHITE, Color.UNPLAYABLE)
+
+
+def _random_board(rng: random.Random, span: int):
+    board = Board(span=span)
+    for coordinate in board.coordinates:
+        board[coordinate] = rng.choice(_CELLS)
+    return board
+
+
+def _reference(board: Board):
+    points = {Color.BLACK: 0, Color.WHITE: 0}
+    reaches = {Color.BLACK: set(), Color.WHITE: set()}
+    for point_set in PointSet.sets(board)[0]:
+        if point_set.color is not Color.EMPTY:
+            points[point_set.color] += len(point_set)
+            continue
+        for color in (Color.BLACK, Color.WHITE):
+            if point_set.reaches[color]:
+                reaches[color] |= {member.index for member in point_set}
+        if point_set.reaches[Color.BLACK] != point_set.reaches[Color.WHITE]:
+            points[Color.BLACK if point_set.reaches[Color.BLACK] else Color.WHITE] += len(point_set)
+    return (points[Color.BLACK], points[Color.WHITE]), (reaches[Color.BLACK], reaches[Color.WHITE])
+
+
+def test_scoring_matches_point_sets():
+    rng = random.Random(0)
+    for span in (1, 2, 3, 5, 9, 13, 19):
+        engine = get_scoring_engine(span)
+        boards = [_random_board(rng, span) for _ in range(20)]
+        expected = [_reference(board) for board in boards]
+        assert engine.points_on_board([board.cells for board in boards]) == [points for points, _ in expected]
+        for board, (_, reaches) in zip(boards, expected):
+            assert engine.reaches(board.cells) == reaches
+
+
+def test_score_games_matches_game_score():
+    games = []
+    rng = random.Random(1)
+    for span in (3, 5, 9):
+        for _ in range(4):
+            game = Game(span=span, compensation=rng.choice((0, 0.5, 6.5, -3)))
+            while not game.over:
+                moves = sorted(game.legal_moves, key=lambda move: -1 if move == PASS else move.index)
+                game = game.play(PASS if rng.random() < 0.1 else rng.choice(moves))
+            games.append(game)
+    for outcome, game in zip(score_games(games), games):
+        expected = game.score().outcome
+        assert (outcome.black_score, outcome.white_score, outcome.winner) == (
+            expected.black_score, expected.white_score, expected.winner
+        )
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import random
+from go.coordinate import PASS
+from go.game import Game
+from go.position import PASS_MOVE
+from go.search import SearchPosition
+
+# SearchPosition is checked against the Game it stands in for, move by move, and against its own earlier states as the
+# moves are unmade.
+
+
+def _legal(game: Game):
+    return {PASS_MOVE if move == PASS else move.index for move in game.legal_moves}
+
+
+def _state(search: SearchPosition):
+    return (
+        bytes(search.cells), search.position, search.check, search.player, search.passes, search.ko, search.history,
+        tuple(search.captures), tuple(search.positions)
+    )
+
+
+def _same(search: SearchPosition, game: Game):
+    assert set(search.legal_moves()) == _legal(game)
+    assert search.position == game.board.position
+    assert search.check == game.board.check
+    assert search.ko == (game.ko_point.index if game.ko_point is not None else -1)
+    assert search.over == game.over
+    assert search.captures[1:] == [game.captures_by_black, game.captures_by_white]
+
+
+def test_make_move_follows_game(variant):
+    rng = random.Random(0)
+    for double_hash in (False, True):
+        for _ in range(6):
+            game = Game(rules=variant, span=rng.choice((2, 3, 4, 5)), double_hash=double_hash)
+            search = SearchPosition(game)
+            states = []
+            while not game.over and game.moves_played < 60:
+                _same(search, game)
+                states.append(_state(search))
+                move = rng.choice(sorted(_legal(game)))
+                search.make_move(move)
+                game = game.play(PASS if move == PASS_MOVE else game.board.coordinates[move])
+            _same(search, game)
+            assert search.to_game().board.cells == game.board.cells
+            while states:
+                search.unmake_move()
+                assert _state(search) == states.pop()
+
+
+
+def test_positions_stack_follows_the_moves():
+    game = Game(span=3)
+    search = SearchPosition(game)
+    assert search.positions == [game.board.position]
+    for move in (0, PASS_MOVE, 4):
+        search.make_move(move)
+    assert len(search.positions) == 1 + search.depth
+    for _ in range(3):
+        search.unmake_move()
+    assert search.positions == [game.board.position]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import io
+import random
+import pytest
+from go import rules
+from go.coordinate import PASS, get_coordinates
+from go.game import Game
+from go.sgf import parse_sgf, read_collection, read_games, read_sgf, write_sgf
+
+
+def _play(rule_set: rules.RuleSet, span: int, seed: int, handicap=()):
+    # A random game with passes along the way, ended by two passes.
+    rng = random.Random(seed)
+    coordinates = get_coordinates(span)
+    game = Game(
+        rules=rule_set,
+        span=span,
+        compensation=5.5,
+        handicap_placement=[coordinates.get(*point) for point in handicap] or None
+    )
+    while game.moves_played < 2 * span * span:
+        moves = sorted((move for move in game.legal_moves if move != PASS), key=lambda move: move.index)
+        game = game.play(PASS if not moves or rng.random() < 0.05 else rng.choice(moves))
+        if game.over:
+            return game
+    return game.play(PASS).play(PASS) if game.previous_move != PASS else game.play(PASS)
+
+
+def _moves(game: Game):
+    moves = []
+    while game.previous_state is not None:
+        if game.moves_played != game.previous_state.moves_played:
+            moves.append(game.previous_move)
+        game = game.previous_state
+    return moves[::-1]
+
+
+def _same(read: Game, game: Game):
+    assert vars(read.rules) == vars(game.rules)
+    assert read.board.span == game.board.span
+    assert read.compensation == game.compensation
+    assert read.handicap_stones == game.handicap_stones
+    assert _moves(read) == _moves(game)
+    assert read.board.position == game.board.position
+    assert read.over == game.over
+
+
+_GAMES = [
+    (rules.TRAINING, 5, 0, ()),
+    (rules.AGA, 7, 1, ((3, 3), (5, 5))),
+    (rules.CHINESE, 9, 2, ((3, 7), (7, 3), (5, 5))),
+    (rules.JAPANESE, 6, 3, ()),
+    (rules.TROMP_TAYLOR, 4, 4, ()),
+]
+
+
+@pytest.mark.parametrize('rule_set, span, seed, handicap', _GAMES)
+def test_round_trip(rule_set, span, seed, handicap):
+    game = _play(rule_set, span, seed, handicap)
+    assert PASS in _moves(game)
+    text = write_sgf(game)
+    assert ('RU[' in text) == (rule_set is not rules.TRAINING)
+    assert ('HA[' in text) == bool(handicap)
+    _same(read_sgf(text), game)
+
+
+def test_round_trip_after_scoring():
+    game = _play(rules.TRAINING, 5, 5).score()
+    text = write_sgf(game)
+    assert 'RE[' in text
+    _same(read_sgf(text), game)
+
+
+def test_escaped_text():
+    text = '(;GM[1]SZ[5]GN[a \\] b \\\\ c]C[line\\\none (not a tree) [x\\]];B[cc]C[\\]];W[];B[tt])'
+    nodes = parse_sgf(text)
+    assert nodes[0]['GN'] == ['a ] b \\ c']
+    assert nodes[0]['C'] == ['lineone (not a tree) [x]']
+    assert nodes[1]['C'] == [']']
+    game = read_sgf(text)
+    assert _moves(game) == [get_coordinates(5).get(3, 3), PASS, PASS]
+    assert game.over
+
+
+@pytest.mark.parametrize('value', ['tt', ''])
+def test_pass_codes_are_not_setup_points(value):
+    with pytest.raises(Exception, match='Malformed setup point'):
+        read_sgf(f'(;GM[1]SZ[9]HA[2]AB[cc][{value}];W[ee])')
+
+
+def test_collection_splits_at_any_chunk_size():
+    games = [_play(*arguments) for arguments in _GAMES]
+    texts = [
+        '(;GM[1]SZ[5]C[a (tricky\\] comment \\\\](;B[aa]))',
+        *(write_sgf(game).strip() for game in games),
+        '(;GM[1]SZ[4]GN[\\\\]C[)(\\]\\\\\\]];B[bb];W[];B[])',
+    ]
+    collection = '\n'.join(texts) + '\n'
+    for chunk_size in (1, 2, 3, 5, 7, 64, 1 << 20):
+        assert list(read_collection(io.StringIO(collection), chunk_size)) == texts
+
+
+def test_read_games_with_workers(tmp_path):
+    games = [_play(*arguments) for arguments in _GAMES]
+    path = tmp_path / 'games.sgf'
+    # The second tree plays out of turn and is skipped unless strict.
+    path.write_text(write_sgf(games[0]) + '(;GM[1]SZ[5];B[aa];B[bb])\n' + ''.join(map(write_sgf, games[1:])))
+    for workers in (0, 2):
+        read = list(read_games([str(path)], workers=workers, chunk_size=16))
+        assert len(read) == len(games)
+        for read_game, game in zip(read, games):
+            _same(read_game, game)
+        with pytest.raises(Exception, match='out of turn'):
+            list(read_games([str(path)], workers=workers, strict=True))